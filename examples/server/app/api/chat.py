@@ -2,28 +2,41 @@ import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
-import tiktoken 
-import json
+import tiktoken
+import numpy as np
+import orjson
 from typing import AsyncGenerator
+import logging
+from functools import lru_cache
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from ..config import SYSTEM_PROMPT
 from ..core.rag import query_knowledge_base
+
+logger = logging.getLogger(__name__)
 # --- Import your chat model and its config ---
 from chain.chat_models.local import LocalChatModel
 from chain.chat_models.base import LocalChatConfig
 from chain.core.types import HumanMessage, SystemMessage
 
 # --- CHAT MODEL SETUP ---
-# Create an instance of your local chat model.
 # The model identifier should match what you've loaded in LM Studio.
 # This assumes you have a chat/instruction-tuned model loaded, not an embedding model.
-chat_config = LocalChatConfig(model="qwen/qwen3-8b")
-chat_model = LocalChatModel(config=chat_config)
-
-
-router = APIRouter()
+#
+# For multi-user throughput, point CHAT_MODEL_BASE_URL at a server with
+# continuous batching (e.g. vLLM started with --max-num-seqs 64
+# --max-num-batched-tokens 8192 --enable-chunked-prefill). The OpenAI-
+# compatible streaming path here works unchanged against either backend.
+@lru_cache(maxsize=1)
+def get_chat_model() -> LocalChatModel:
+    """Builds the chat model on first use instead of at worker import."""
+    chat_config = LocalChatConfig(
+        model=os.getenv("CHAT_MODEL_NAME", "qwen/qwen3-8b"),
+        base_url=os.getenv("CHAT_MODEL_BASE_URL", "http://localhost:1234/v1"),
+    )
+    return LocalChatModel(config=chat_config)
 
 # --- TOKENIZER and CONTEXT LIMIT SETUP ---
 # It's a good practice to define the model's limits.
@@ -36,55 +49,69 @@ except:
     # Fallback for older versions
     tokenizer = tiktoken.get_encoding("p50k_base")
 
+# The system prompt is constant, so count its tokens once at import time
+# instead of per request.
+SYSTEM_PROMPT_TOKEN_COUNT = len(tokenizer.encode(SYSTEM_PROMPT))
+
 router = APIRouter()
 
+# Constant byte pieces of the streamed JSON frames; only the token delta
+# is serialized per chunk, and frames stay bytes so StreamingResponse does
+# no str->bytes encoding per token.
+_TEXT_PREFIX = b'{"type": "text", "delta": '
+_FRAME_SUFFIX = b'}\n'
+
 class ChatRequest(BaseModel):
     question: str
 
-async def rag_stream_generator(question: str) -> AsyncGenerator[str, None]:
-    print(f"Retrieving context for question: {question}")
+async def rag_stream_generator(question: str) -> AsyncGenerator[bytes, None]:
+    logger.info("Retrieving context for question: %s", question)
     retrieved_chunks = query_knowledge_base(question)
     
     # --- FIX: Intelligent Context Truncation ---
-    context = ""
-    current_token_count = 0
-    
-    # Build the context string chunk by chunk, checking the token count
-    for chunk in retrieved_chunks:
-        chunk_text = chunk.get('text', '') # pyright: ignore[reportOptionalMemberAccess]
-        chunk_token_count = len(tokenizer.encode(chunk_text))
-        
-        # Add the chunk if it fits within our defined limit
-        if current_token_count + chunk_token_count < CONTEXT_LIMIT:
-            context += f"\n\n---\n\n{chunk_text}"
-            current_token_count += chunk_token_count
-        else:
-            # Stop adding chunks once we're near the limit
-            print("Context limit reached. Truncating further context.")
-            break
-    
+    # Tokenize all retrieved chunks in one batch call: tiktoken's Rust core
+    # releases the GIL and runs the texts in parallel, instead of paying
+    # per-call overhead inside a Python loop.
+    chunk_texts = [chunk.get('text', '') for chunk in retrieved_chunks] # pyright: ignore[reportOptionalMemberAccess]
+    chunk_token_counts = np.fromiter(
+        (len(ids) for ids in tokenizer.encode_batch(chunk_texts, num_threads=os.cpu_count() or 1)),
+        dtype=np.int64,
+        count=len(chunk_texts),
+    )
+
+    # Find the truncation point with one vectorized prefix-sum instead of a
+    # Python accumulate-and-break loop: the first chunk whose running total
+    # exceeds the remaining token budget marks the cutoff.
+    token_budget = CONTEXT_LIMIT - SYSTEM_PROMPT_TOKEN_COUNT
+    cutoff = int(np.searchsorted(np.cumsum(chunk_token_counts), token_budget, side="left"))
+    if cutoff < len(chunk_texts):
+        logger.info("Context limit reached. Truncating further context.")
+
+    # Join the accepted chunks once (avoids repeated string concatenation).
+    context = "".join(f"\n\n---\n\n{text}" for text in chunk_texts[:cutoff])
+
     if not context:
         context = "No relevant context found in the knowledge base."
 
-    # Define the messages to be sent to the model
+    # Define the messages to be sent to the model. The shared SYSTEM_PROMPT
+    # constant keeps the prefix byte-identical with ChatService, so a
+    # prefix-caching backend reuses the prefill across both endpoints.
     messages = [
-        SystemMessage(content=(
-            "You are an expert legal AI assistant... (rest of your system prompt)"
-        )),
+        SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=f"Context:\n{context}\n\n---\n\nQuestion: {question}")
     ]
     
-    print(f"Streaming response from local chat model: {chat_model.model_name}...")
+    chat_model = get_chat_model()
+    logger.info("Streaming response from local chat model: %s...", chat_model.model_name)
     try:
         for chunk in chat_model.stream(messages):
-            sse_chunk = {"type": "text", "delta": chunk}
-            yield f"{json.dumps(sse_chunk)}\n"
+            yield _TEXT_PREFIX + orjson.dumps(chunk) + _FRAME_SUFFIX
     except Exception as e:
-        print(f"Error during streaming from local model: {e}")
+        logger.exception("Error during streaming from local model: %s", e)
         error_chunk = {"type": "error", "message": str(e)}
-        yield f"{json.dumps(error_chunk)}\n"
+        yield orjson.dumps(error_chunk) + b"\n"
 
-    print("Finished streaming.")
+    logger.info("Finished streaming.")
 
 @router.post("/stream_rag_query")
 async def stream_rag_query_endpoint(request: ChatRequest):
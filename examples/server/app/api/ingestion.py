@@ -1,56 +1,109 @@
 # api/ingestion.py
+import logging
 import sys
 import os
 import uuid
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
+import aiofiles
 from fastapi import APIRouter, UploadFile, BackgroundTasks
 from pathlib import Path
-import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unstructured.partition.auto import partition
 from chain.text_splitters import RecursiveCharacterTextSplitter
 # from langchain.text_splitter import RecursiveCharacterTextSplitter
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 
-from chain.embeddings.local import LocalEmbeddings
+from ..deps import COLLECTION_NAME, embedding_model, qdrant_client
+
+logger = logging.getLogger(__name__)
 
 # --- RAG PIPELINE SETUP (Updated for Arabic and a new model) ---
+# The embedding model, Qdrant client, and collection name are shared
+# singletons from app.deps, so retrieval talks to the same collection.
+
+def initialize_collection() -> None:
+    """
+    Probes the embedding size and ensures the Qdrant collection exists.
 
-# --- FIX 1: Update the model name to match your powerful MLX model ---
-# This identifier MUST match what your LM Studio server expects.
-embedding_model = LocalEmbeddings(model_name="mlx-community/Qwen3-Embedding-8B-4bit-DWG")
-
-qdrant_client = QdrantClient(host="localhost", port=6333)
-COLLECTION_NAME = "legal_documents_arabic" # It's good practice to use a new collection for a different model
-
-try:
-    # We must get the embedding size for the NEW model.
-    print("Determining embedding size for the new model...")
-    embedding_size = len(embedding_model.embed_query("test"))
-    print(f"Detected embedding size: {embedding_size}")
-except Exception as e:
-    print(f"Could not connect to embedding model to get embedding size. Error: {e}")
-    # Qwen models often have a different size, e.g., 4096. A fallback is less reliable here.
-    embedding_size = 4096 # A common size for larger models, but connecting is better.
-
-try:
-    qdrant_client.get_collection(collection_name=COLLECTION_NAME)
-    print(f"Collection '{COLLECTION_NAME}' already exists.")
-except Exception:
-    print(f"Collection '{COLLECTION_NAME}' not found. Creating a new one.")
-    qdrant_client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=models.VectorParams(
-            size=embedding_size,
-            distance=models.Distance.COSINE
-        ),
-    )
+    This used to run at import time, so every worker process paid three
+    synchronous network round-trips before the app could even start. It is
+    now called once from the FastAPI lifespan hook in main.py.
+    """
+    try:
+        # We must get the embedding size for the NEW model.
+        logger.info("Determining embedding size for the new model...")
+        embedding_size = len(embedding_model.embed_query("test"))
+        logger.info("Detected embedding size: %s", embedding_size)
+    except Exception as e:
+        logger.warning("Could not connect to embedding model to get embedding size. Error: %s", e)
+        # Qwen models often have a different size, e.g., 4096. A fallback is less reliable here.
+        embedding_size = 4096 # A common size for larger models, but connecting is better.
+
+    try:
+        qdrant_client.get_collection(collection_name=COLLECTION_NAME)
+        logger.info("Collection '%s' already exists.", COLLECTION_NAME)
+    except Exception:
+        logger.info("Collection '%s' not found. Creating a new one.", COLLECTION_NAME)
+        qdrant_client.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=models.VectorParams(
+                size=embedding_size,
+                distance=models.Distance.COSINE,
+                # Raw FP32 vectors spill to disk; searches traverse the
+                # always-in-RAM quantized codes and only touch disk for the
+                # rescore pass over a handful of oversampled candidates.
+                on_disk=True,
+            ),
+            # Explicit HNSW graph parameters instead of the server defaults:
+            # m=16 links per node with a deeper ef_construct build buys better
+            # recall/latency at query time for a one-time ingestion cost.
+            hnsw_config=models.HnswConfigDiff(
+                m=16,
+                ef_construct=200,
+            ),
+            # Keep binary-quantized copies of the 4096-dim vectors in RAM:
+            # one bit per dimension (32x smaller than FP32), with distances
+            # computed as popcounts over packed bits. High-dimensional
+            # embeddings tolerate this well, and queries rescore the
+            # oversampled candidates against the original vectors.
+            quantization_config=models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=True,
+                )
+            ),
+        )
+        # Index the "source" payload field now, so future source-filtered
+        # queries hit a keyword index instead of scanning every payload.
+        qdrant_client.create_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name="source",
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
 
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=1000,
     chunk_overlap=150,
 )
 
+# Number of chunks embedded (and then upserted) per request during ingestion.
+EMBED_BATCH_SIZE = 32
+
+# Document parsing is CPU-heavy (OCR, layout detection) and holds the GIL,
+# so it runs in worker processes rather than the server's thread pool.
+_parse_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2))
+
+def _parse_document(filepath: str) -> list[str]:
+    """Parses one document in a worker process and returns its element texts."""
+    elements = partition(filename=filepath, languages=['ara'])
+    return [e.text for e in elements]
+
+# Namespace for deterministic point IDs: a chunk's ID is derived from its
+# source file and text, so re-ingesting the same document overwrites its
+# existing points instead of piling up duplicates (and skips one urandom
+# read per point that uuid4 would cost).
+_POINT_ID_NS = uuid.UUID("6ba7b810-9dad-11d1-80b4-00c04fd430c8")
+
 SOURCE_DOCS_PATH = Path("./persistent_storage/source_documents")
 router = APIRouter()
 
@@ -58,53 +111,70 @@ def process_document_in_background(filepath: Path):
     """
     The RAG pipeline function updated for Arabic.
     """
-    print(f"BACKGROUND TASK: Parsing '{filepath.name}' with Arabic language support...")
+    logger.info("BACKGROUND TASK: Parsing '%s' with Arabic language support...", filepath.name)
     
     # --- FIX 2: Specify the language for unstructured ---
-    # The `languages` parameter takes a list of language codes.
+    # Parsing happens in a worker process so multiple documents can parse
+    # concurrently across cores without blocking other background tasks.
     try:
-        elements = partition(filename=str(filepath), languages=['ara'])
+        element_texts = _parse_pool.submit(_parse_document, str(filepath)).result()
     except Exception as e:
-        print(f"Error during document parsing: {e}")
+        logger.exception("Error during document parsing: %s", e)
         # If parsing fails, we should stop processing this file.
         return
-    
-    print(f"BACKGROUND TASK: Chunking '{filepath.name}'...")
-    full_text = "\n\n".join([e.text for e in elements])
+
+    logger.info("BACKGROUND TASK: Chunking '%s'...", filepath.name)
+    full_text = "\n\n".join(element_texts)
     chunks = text_splitter.split_text(full_text)
     
     if not chunks:
-        print(f"BACKGROUND TASK: No content found in '{filepath.name}'. Skipping.")
+        logger.info("BACKGROUND TASK: No content found in '%s'. Skipping.", filepath.name)
         return
 
-    print(f"BACKGROUND TASK: Embedding and Indexing '{filepath.name}' with Qwen2 into Qdrant...")
-    embeddings = embedding_model.embed_documents(chunks)
-    
-    points = [
-        models.PointStruct(
-            id=str(uuid.uuid4()),
-            vector=embedding,
-            payload={"source": filepath.name, "text": chunk}
+    logger.info("BACKGROUND TASK: Embedding and Indexing '%s' with Qwen2 into Qdrant...", filepath.name)
+    # One pipeline stage per micro-batch: each worker embeds its batch and
+    # immediately ships the resulting points, so the upsert round-trip of one
+    # batch overlaps the next batch's embedding instead of running as a
+    # second serial phase over the whole document. Points never accumulate
+    # in memory beyond the batches currently in flight.
+    batches = [chunks[i:i + EMBED_BATCH_SIZE] for i in range(0, len(chunks), EMBED_BATCH_SIZE)]
+
+    def _embed_and_upsert(batch_chunks: list[str]) -> None:
+        embeddings = embedding_model.embed_documents(batch_chunks)
+        points = [
+            models.PointStruct(
+                id=str(uuid.uuid5(_POINT_ID_NS, f"{filepath.name}\x00{chunk}")),
+                vector=embedding,
+                payload={"source": filepath.name, "text": chunk}
+            )
+            for embedding, chunk in zip(embeddings, batch_chunks)
+        ]
+        # wait=True per batch: the worker pool already overlaps upserts with
+        # other batches' embedding, and waiting per batch is the only way to
+        # guarantee every point has been applied once the pool drains —
+        # batches are submitted concurrently, so a lone waiting "last" batch
+        # would not order after the others.
+        qdrant_client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=points,
+            wait=True
         )
-        for embedding, chunk in zip(embeddings, chunks)
-    ]
-    
-    qdrant_client.upsert(
-        collection_name=COLLECTION_NAME,
-        points=points,
-        wait=True
-    )
-    print(f"BACKGROUND TASK: Finished indexing '{filepath.name}'. Added {len(chunks)} points to Qdrant.")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_embed_and_upsert, batches))
+    logger.info("BACKGROUND TASK: Finished indexing '%s'. Added %d points to Qdrant.", filepath.name, len(chunks))
 
 @router.post("/ingest")
 async def ingest_documents(files: list[UploadFile], background_tasks: BackgroundTasks):
-    # This endpoint remains unchanged.
     saved_files = []
     for file in files:
         filepath = SOURCE_DOCS_PATH / file.filename # type: ignore
-        with filepath.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
+        # Stream the upload to disk in 1 MiB pieces through aiofiles;
+        # shutil.copyfileobj would block the event loop for the whole copy.
+        async with aiofiles.open(filepath, "wb") as buffer:
+            while chunk := await file.read(1 << 20):
+                await buffer.write(chunk)
+
         background_tasks.add_task(process_document_in_background, filepath)
         saved_files.append(file.filename)
         
@@ -4,27 +4,46 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
-from chain.chat_models import LocalChatModel, LocalChatConfig
 from chain.core.types import HumanMessage, SystemMessage
+from .config import SYSTEM_PROMPT
+from .deps import get_local_chat_model
+from .streaming import aiter_sync
 from typing import AsyncGenerator
-import json
+import logging
+import re
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Splits a chunk into text segments and think tags in one pass, instead of
+# two substring scans plus two str.replace calls per streamed token.
+_THINK_TAG_RE = re.compile(r'(<think>|</think>)')
+
+# Pre-encoded JSON frame pieces; only the delta payload changes per token.
+# Frames are built as bytes so StreamingResponse skips the str->bytes
+# encode round-trip on every token.
+_TEXT_PREFIX = b'{"type": "text", "delta": '
+_REASONING_PREFIX = b'{"type": "reasoning", "delta": '
+_FRAME_SUFFIX = b'}\n'
 
 class ChatService:
     """A stateless service for direct conversations with the local LLM."""
     
     def __init__(self):
         try:
-            config = LocalChatConfig()
-            self.chat_model = LocalChatModel(config=config)
-            self.system_prompt = "You are a helpful legal AI assistant for an egyption attorney you should always be formal and always speak on egyption arabic never use english responses even if the user input is english with no emojis."
+            # Shared process-wide instance: ChatService may be constructed
+            # per request, but the model handle is built exactly once.
+            self.chat_model = get_local_chat_model()
+            self.system_prompt = SYSTEM_PROMPT
         except Exception as e:
-            print(f"FATAL: Could not initialize LocalChatModel. Is LM Studio running? Error: {e}")
+            logger.error("FATAL: Could not initialize LocalChatModel. Is LM Studio running? Error: %s", e)
             self.chat_model = None
 
-    async def stream_chat(self, question: str) -> AsyncGenerator[str, None]:
+    async def stream_chat(self, question: str) -> AsyncGenerator[bytes, None]:
         if not self.chat_model:
             error_obj = {"type": "error", "message": "Chat model is not available."}
-            yield f"{json.dumps(error_obj)}\n"
+            yield orjson.dumps(error_obj) + b"\n"
             return
 
         messages = [
@@ -34,22 +53,26 @@ class ChatService:
         
         try:
             is_reasoning = False
-            for chunk in self.chat_model.stream(messages):
-                # This is the new logic to separate text from reasoning
-                if '<think>' in chunk:
-                    is_reasoning = True
-                    chunk = chunk.replace('<think>', '')
-                if '</think>' in chunk:
-                    is_reasoning = False
-                    chunk = chunk.replace('</think>', '')
-                
-                if is_reasoning and chunk.strip():
-                    reasoning_obj = {"type": "reasoning", "delta": chunk}
-                    yield f"{json.dumps(reasoning_obj)}\n"
-                elif chunk.strip():
-                    text_obj = {"type": "text", "delta": chunk}
-                    yield f"{json.dumps(text_obj)}\n"
+            async for chunk in aiter_sync(self.chat_model.stream(messages)):
+                # Fast path: most chunks carry no tags, so one substring
+                # check skips the regex machinery entirely.
+                if '<' not in chunk:
+                    if chunk.strip():
+                        prefix = _REASONING_PREFIX if is_reasoning else _TEXT_PREFIX
+                        yield prefix + orjson.dumps(chunk) + _FRAME_SUFFIX
+                    continue
+                # Separate text from reasoning with a single regex split;
+                # tags flip the state, other segments are emitted with a
+                # precomputed frame prefix.
+                for segment in _THINK_TAG_RE.split(chunk):
+                    if segment == '<think>':
+                        is_reasoning = True
+                    elif segment == '</think>':
+                        is_reasoning = False
+                    elif segment.strip():
+                        prefix = _REASONING_PREFIX if is_reasoning else _TEXT_PREFIX
+                        yield prefix + orjson.dumps(segment) + _FRAME_SUFFIX
 
         except Exception as e:
             error_obj = {"type": "error", "message": str(e)}
-            yield f"{json.dumps(error_obj)}\n"
\ No newline at end of file
+            yield orjson.dumps(error_obj) + b"\n"
\ No newline at end of file
@@ -8,14 +8,30 @@ class Settings(BaseSettings):
     max_file_size: int = 50 * 1024 * 1024  # 50MB
     allowed_extensions: set = {".pdf", ".txt", ".md", ".py"}
     
-    # RAG Configuration
+    # RAG Configuration. Chunking is the highest-impact retrieval dial
+    # (bigger chunks -> fewer vectors -> faster search), so it's tunable
+    # via environment instead of baked into the code.
     chunk_size: int = 1000
     chunk_overlap: int = 200
     retrieval_k: int = 3
     debug: bool = True
+
+    # Embedding backend. The model identifier must match what the local
+    # server expects; batch size bounds the payload of one embedding call.
+    embedding_model: str = "nomic-ai/nomic-embed-text-v1.5"
+    embedding_batch_size: int = 128
     
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
+# Shared system prompt. Kept as one module-level constant so every request
+# sends a byte-identical prefix — backends with prefix caching (e.g. vLLM's
+# --enable-prefix-caching) can then skip re-prefilling it after the first call.
+SYSTEM_PROMPT = (
+    "You are a helpful legal AI assistant for an egyption attorney you should "
+    "always be formal and always speak on egyption arabic never use english "
+    "responses even if the user input is english with no emojis."
+)
+
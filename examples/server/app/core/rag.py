@@ -1,27 +1,52 @@
 # core/rag.py
-from qdrant_client import QdrantClient
-from chain.embeddings.local import LocalEmbeddings
+from functools import lru_cache
 
-# Reuse the same instances
-# --- Use the same updated model name ---
-embedding_model = LocalEmbeddings(model_name="mlx-community/Qwen3-Embedding-8B-4bit-DWG")
+from qdrant_client import models
 
-qdrant_client = QdrantClient(host="localhost", port=6333)
-COLLECTION_NAME = "legal_documents"
+# Reuse the same instances as ingestion (one embedding model, one Qdrant
+# connection pool, one collection name) via the shared app.deps module.
+from ..deps import COLLECTION_NAME, embedding_model, qdrant_client
+
+@lru_cache(maxsize=1024)
+def _cached_query_embedding(query: str) -> tuple:
+    """
+    Embeds a stripped query, caching the result in-process.
+
+    Chat UIs frequently re-send near-identical queries (retries, follow-ups);
+    a cache hit skips the full HTTP round-trip to the embedding server.
+    The text is only stripped, not case-folded: lowercasing would embed a
+    different string and silently change retrieval for case-bearing queries.
+    Returns a tuple because lru_cache values should be immutable.
+    """
+    return tuple(embedding_model.embed_query(query))
 
 def query_knowledge_base(query_text: str, n_results: int = 5):
     """
     Queries the Qdrant collection for relevant document chunks.
     """
-    query_embedding = embedding_model.embed_query(query_text)
-    
-    # In Qdrant, this is called a "search" operation
-    search_results = qdrant_client.search(
+    query_embedding = list(_cached_query_embedding(query_text.strip()))
+
+    # query_points is the current Qdrant query API (search() is deprecated).
+    # Searching over the binary-quantized vectors with rescoring keeps recall:
+    # the HNSW traversal uses popcount distances on packed bits, then the
+    # oversampled candidates are re-scored against the original FP32 vectors.
+    response = qdrant_client.query_points(
         collection_name=COLLECTION_NAME,
-        query_vector=query_embedding,
+        query=query_embedding,
         limit=n_results,
-        with_payload=True # Ensure we get our metadata back
+        with_payload=True, # Ensure we get our metadata back
+        search_params=models.SearchParams(
+            # Search-time beam width; pairs with the m/ef_construct build
+            # parameters set on the collection at ingestion.
+            hnsw_ef=64,
+            quantization=models.QuantizationSearchParams(
+                rescore=True,
+                # Binary quantization is lossier than int8, so oversample a
+                # little more before the rescore pass.
+                oversampling=3.0,
+            )
+        ),
     )
-    
+
     # The payload contains our original metadata
-    return [hit.payload for hit in search_results]
\ No newline at end of file
+    return [hit.payload for hit in response.points]
\ No newline at end of file
@@ -0,0 +1,104 @@
+# File: app/deps.py
+"""
+Shared singletons for the RAG server.
+
+ingestion.py and core/rag.py each used to build their own LocalEmbeddings
+and QdrantClient — two connection pools to the same servers — and pointed
+at *different* collection names ("legal_documents_arabic" vs
+"legal_documents"), so queries silently missed everything that ingestion
+wrote. Both modules now import the one embedding model, Qdrant client, and
+collection name from here.
+"""
+import logging
+import os
+import sys
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
+
+from qdrant_client import QdrantClient
+
+from chain.chat_models import LocalChatModel, LocalChatConfig
+from chain.embeddings.local import LocalEmbeddings
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCachingLocalEmbeddings(LocalEmbeddings):
+    """
+    LocalEmbeddings whose embed_query memoizes recent questions.
+
+    Chat UIs repeat questions, and each embed_query is a network round-trip
+    to the embedding server; a cache hit turns the query hot path into a
+    pure local FAISS search. Keyed on the stripped text (lowercasing would
+    embed a different string); embed_documents is left uncached since
+    ingestion rarely sees repeats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._embed_query_cached = lru_cache(maxsize=1024)(super().embed_query)
+
+    def embed_query(self, text: str):
+        # Return a copy so callers mutating the vector can't poison the cache.
+        return list(self._embed_query_cached(text.strip()))
+
+    def embed_documents(self, texts):
+        # Split oversized ingestion batches so one call never ships an
+        # unbounded payload to the embedding server.
+        batch = settings.embedding_batch_size
+        if len(texts) <= batch:
+            return super().embed_documents(texts)
+        vectors = []
+        for start in range(0, len(texts), batch):
+            vectors.extend(super().embed_documents(texts[start:start + batch]))
+        return vectors
+
+
+@lru_cache(maxsize=1)
+def get_local_embeddings() -> LocalEmbeddings:
+    """
+    Process-wide default LocalEmbeddings instance.
+
+    Constructing the embedding backend per request (or per service
+    instance) pays model/connection setup every time; every caller shares
+    this one (with query-embedding memoization layered on top).
+    """
+    return QueryCachingLocalEmbeddings(model_name=settings.embedding_model)
+
+
+@lru_cache(maxsize=1)
+def get_local_chat_model() -> LocalChatModel:
+    """Process-wide LocalChatModel with the default LM Studio config."""
+    return LocalChatModel(config=LocalChatConfig())
+
+
+def create_embedding_model():
+    """
+    Builds the embedding backend for the RAG pipeline.
+
+    If ONNX_EMBEDDING_MODEL_PATH points at an exported ONNX model, embeddings
+    run in-process with INT8 quantization and batched inference — no HTTP hop
+    per call. Otherwise falls back to the LM Studio server.
+    """
+    onnx_model_path = os.getenv("ONNX_EMBEDDING_MODEL_PATH")
+    if onnx_model_path:
+        from chain.embeddings import ONNXEmbeddings
+        logger.info("Using in-process ONNX embedding model: %s", onnx_model_path)
+        return ONNXEmbeddings(model_path=onnx_model_path)
+
+    # This identifier MUST match what your LM Studio server expects.
+    return LocalEmbeddings(model_name="mlx-community/Qwen3-Embedding-8B-4bit-DWG")
+
+
+embedding_model = create_embedding_model()
+
+# prefer_grpc sends vectors as packed float32 over gRPC (port 6334) instead
+# of ~80KB of ASCII floats as JSON per 4096-dim query — ~5x smaller payloads
+# and no JSON parse. The client API is identical either way.
+qdrant_client = QdrantClient(host="localhost", port=6333, grpc_port=6334, prefer_grpc=True)
+
+# One collection name for both ingestion and retrieval.
+COLLECTION_NAME = "legal_documents_arabic"
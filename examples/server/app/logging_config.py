@@ -0,0 +1,38 @@
+# File: app/logging_config.py
+"""
+Queue-based logging setup for the RAG server.
+
+print() and direct stream handlers block the calling thread on stdio locks
+and flushes, which shows up as tail latency on streaming endpoints. With a
+QueueHandler the request path only enqueues a record; a background
+QueueListener thread does the actual formatting and I/O.
+"""
+import atexit
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Routes root logging through a queue so request threads never block on I/O.
+
+    Safe to call more than once; subsequent calls are no-ops.
+    """
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+
+    log_queue: SimpleQueue = SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
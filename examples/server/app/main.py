@@ -3,23 +3,79 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
-from fastapi import FastAPI, File, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, File, HTTPException, UploadFile, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pathlib import Path
+import asyncio
 import shutil
 import json
+import orjson
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 import uuid
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from chain.rag_runner import create_smart_rag
 from chain.vectors.faiss import FAISSVectorStore
 from chain.embeddings.local import LocalEmbeddings
 from chain.chat_models import LocalChatModel, LocalChatConfig
 from chain.core.types import HumanMessage, SystemMessage
 from .models import QueryRequest
+from .logging_config import configure_logging
+from .rag_service import RAGService
 from .api import ingestion , chat
 # --- Configuration ---
-app = FastAPI()
+
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs one-time startup work (embedding-size probe, Qdrant collection
+    setup) once per worker process, off the import path, so workers become
+    ready without blocking on network round-trips at import time.
+    """
+    await asyncio.to_thread(ingestion.initialize_collection)
+    # Persist RAG-store mutations in the background so uploads return
+    # without waiting for disk writes; the cancellation path flushes
+    # whatever is still dirty at shutdown.
+    rag_service = RAGService()
+    flush_task = asyncio.create_task(rag_service.flush_runner_periodically())
+    # Drains queued uploads so the upload handler never blocks on the
+    # parse/chunk/embed pipeline.
+    ingest_task = asyncio.create_task(rag_service.process_ingest_queue())
+    yield
+    for task in (ingest_task, flush_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+# Token-streaming endpoints must bypass gzip: Starlette's GZipMiddleware
+# never sync-flushes the deflate buffer per chunk, so tiny per-token
+# frames would sit in the compressor and reach gzip-accepting clients in
+# delayed bursts instead of incrementally.
+_STREAMING_PATHS = {"/api/stream_rag_query"}
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves the token-streaming routes uncompressed."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in _STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# ORJSONResponse skips jsonable_encoder + stdlib json for every dict-
+# returning endpoint.
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+# Compress the non-streaming JSON responses; compresslevel=1 is the
+# cheapest CPU-wise and still cuts the repetitive JSON severalfold for
+# clients that send Accept-Encoding.
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=500, compresslevel=1)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure appropriately for production
@@ -30,9 +86,27 @@ app.add_middleware(
 
 app.include_router(ingestion.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
+
+# The body never changes, so serialize it once at import time.
+_ROOT_RESPONSE_BODY = orjson.dumps({"message": "Welcome to the Legal AI RAG API"})
+
+@app.get("/")
 async def read_root():
     """A simple root endpoint to confirm the server is running."""
-    return {"message": "Welcome to the Legal AI RAG API"}
+    return Response(content=_ROOT_RESPONSE_BODY, media_type="application/json")
+
+@app.get("/documents/{document_id}/status")
+async def document_status(document_id: str):
+    """Reports where a queued upload is in the ingestion pipeline."""
+    entry = RAGService().get_document_status(document_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Unknown document id.")
+    return {
+        "document_id": document_id,
+        "status": entry.get("status", "ready"),
+        "chunks_created": entry.get("chunks_created"),
+        "error": entry.get("error"),
+    }
 
 # STORAGE_PATH = Path("./persistent_storage")
 # FAISS_INDEX_PATH = str(STORAGE_PATH / "faiss_index")
@@ -386,4 +460,15 @@ async def read_root():
 #         file_id=file_id,
 #         original_filename=file.filename,
 #         status="pending_embedding"
-#     )
\ No newline at end of file
+#     )
+if __name__ == "__main__":
+    import uvicorn
+    # uvloop + httptools roughly double frame throughput on the token
+    # streams compared to the stdlib selector loop and h11 parser.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -1,9 +1,13 @@
 # ===== app/models.py =====
 import uuid
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from enum import Enum
 
+# Shared config for the request/response models: validated once, immutable
+# afterwards, so per-request overhead stays at the initial parse.
+_MODEL_CONFIG = ConfigDict(str_strip_whitespace=True, frozen=True, validate_assignment=False)
+
 class DocumentType(str, Enum):
     PDF = "pdf"
     TEXT = "text"
@@ -11,22 +15,27 @@ class DocumentType(str, Enum):
     PYTHON = "python"
 
 class QueryRequest(BaseModel):
+    model_config = _MODEL_CONFIG
     question: str = Field(..., description="The question to ask about the documents")
     include_context: bool = Field(True, description="Whether to include retrieved context")
     retrieval_k: int = Field(3, description="Number of relevant chunks to retrieve", ge=1, le=10)
+    nprobe: Optional[int] = Field(None, description="IVF clusters scanned per search (higher = better recall, slower)", ge=1, le=1024)
 
 class QueryResponse(BaseModel):
+    model_config = _MODEL_CONFIG
     answer: str
     retrieved_chunks: Optional[List[str]] = None
     processing_time: float
 
 class UploadResponse(BaseModel):
+    model_config = _MODEL_CONFIG
     message: str
     document_id: str
     document_type: DocumentType
     chunks_created: int
 
 class HealthResponse(BaseModel):
+    model_config = _MODEL_CONFIG
     status: str
     documents_loaded: int
     service_ready: bool
@@ -34,6 +43,7 @@ class HealthResponse(BaseModel):
 
 # New, more detailed response for our production-grade upload endpoint
 class V2UploadResponse(BaseModel):
+    model_config = _MODEL_CONFIG
     message: str = Field(..., example="File accepted and is being processed.") # type: ignore
     file_id: uuid.UUID = Field(..., description="The unique internal ID for this document.")
     original_filename: str
@@ -0,0 +1,139 @@
+# File: app/query_cache.py
+"""
+LRU + TTL cache for repeated RAG queries.
+
+Identical questions hit an exact sha1-keyed entry; near-duplicates hit a
+semantic tier that compares the incoming query embedding against the cached
+ones. On a hit the stored response frames are replayed directly, skipping
+embedding, ANN search, and the whole LLM generation.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CachedAnswer:
+    """A fully rendered streamed response, ready to replay byte-for-byte."""
+    frames: List[bytes]
+    embedding: Optional[np.ndarray] = None  # L2-normalized float32, or None
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class QueryCache:
+    """
+    Bounded cache of streamed answers with exact and semantic lookup.
+
+    Entries are evicted least-recently-used once `capacity` is reached and
+    ignored once older than `ttl_seconds`. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 512,
+        ttl_seconds: float = 600.0,
+        similarity_threshold: float = 0.92,
+    ):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._lock = threading.RLock()
+        # (n, d) float32 matrix of the cached embeddings, rebuilt lazily
+        # after mutations so the semantic lookup is one BLAS matmul instead
+        # of a Python loop over entries.
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._matrix_dirty = True
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return hashlib.sha1(question.strip().lower().encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def _expired(self, entry: CachedAnswer) -> bool:
+        return (time.monotonic() - entry.created_at) > self.ttl_seconds
+
+    def _rebuild_matrix(self) -> None:
+        """Stacks live embeddings into one float32 matrix. Caller holds the lock."""
+        keys = [
+            key for key, entry in self._entries.items()
+            if entry.embedding is not None and not self._expired(entry)
+        ]
+        self._matrix_keys = keys
+        if keys:
+            self._matrix = np.vstack([self._entries[k].embedding for k in keys])
+        else:
+            self._matrix = None
+        self._matrix_dirty = False
+
+    def get(self, question: str, embedding=None) -> Optional[CachedAnswer]:
+        """
+        Returns a cached answer for the question, or None.
+
+        Tries the exact key first, then (when an embedding is supplied) the
+        most similar cached entry above the similarity threshold.
+        """
+        key = self._key(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry):
+                    del self._entries[key]
+                    self._matrix_dirty = True
+                else:
+                    self._entries.move_to_end(key)
+                    return entry
+
+            query_vec = self._normalize(embedding)
+            if query_vec is None:
+                return None
+            # One matrix-vector product scores every cached entry at once;
+            # the matrix is rebuilt only after inserts/evictions.
+            while True:
+                if self._matrix_dirty:
+                    self._rebuild_matrix()
+                if self._matrix is None:
+                    return None
+                scores = self._matrix @ query_vec
+                best = int(np.argmax(scores))
+                if float(scores[best]) <= self.similarity_threshold:
+                    return None
+                best_key = self._matrix_keys[best]
+                best_entry = self._entries.get(best_key)
+                if best_entry is None or self._expired(best_entry):
+                    # Stale row — drop it and rescan the refreshed matrix.
+                    self._entries.pop(best_key, None)
+                    self._matrix_dirty = True
+                    continue
+                self._entries.move_to_end(best_key)
+                return best_entry
+
+    def put(self, question: str, frames: List[bytes], embedding=None) -> None:
+        """Stores a rendered response, evicting the LRU entry when full."""
+        entry = CachedAnswer(frames=list(frames), embedding=self._normalize(embedding))
+        key = self._key(question)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._matrix_dirty = True
+
+    def clear(self) -> None:
+        """Drops everything — call whenever the underlying corpus changes."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix_dirty = True
@@ -1,19 +1,50 @@
 # ===== app/rag_service.py =====
-import json
-import pickle
+import asyncio
+import re
 import sys
 import os
+import threading
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 
+import orjson
+
 from chain.core.types import HumanMessage, SystemMessage
-from chain.rag_runner import create_smart_rag, RAGRunner
+from chain.rag_runner import create_smart_rag, RAGConfig, RAGRunner
+from chain.vectors import FAISSVectorStore
 from pathlib import Path
 from typing import Dict, Optional
 import uuid
 import time
 from .config import settings
+from .deps import get_local_embeddings
 from .models import DocumentType
 from typing import AsyncGenerator
+from .query_cache import QueryCache
+from .search_batcher import SearchBatcher
+from .streaming import aiter_sync
+
+# One precompiled pattern handles both think tags in a single pass per
+# chunk, instead of two substring scans plus two str.replace calls.
+_THINK_TAG_RE = re.compile(r'(<think>|</think>)')
+
+# Constant byte pieces of the streamed JSON frames; only the delta payload
+# is serialized per token, and frames stay bytes end-to-end so
+# StreamingResponse never re-encodes them.
+_TEXT_PREFIX = b'{"type": "text", "delta": '
+_REASONING_PREFIX = b'{"type": "reasoning", "delta": '
+_FRAME_SUFFIX = b'}\n'
+
+# Guards singleton construction; the post-init fast path never takes it.
+_instance_lock = threading.Lock()
+
+# Extension -> document type, resolved once at import; adding a format is a
+# one-line change here instead of a new elif branch.
+_EXT_MAP = {
+    '.pdf': DocumentType.PDF,
+    '.md': DocumentType.MARKDOWN,
+    '.py': DocumentType.PYTHON,
+}
+_DEFAULT_DOC_TYPE = DocumentType.TEXT
 
 
 class RAGService:
@@ -21,60 +52,244 @@ class RAGService:
     
     _instance = None
     _rag_runner: Optional[RAGRunner] = None
+    _runner_loaded = False
     _document_registry: Dict[str, dict] = {}
-    _runner_save_path = Path("rag_runner.pkl") # Define a save path
+    # Mirrors the registry's file paths for O(1) membership checks; kept in
+    # sync on add/load so a future delete path never has to scan the registry.
+    _file_paths: set = set()
+    _store_save_path = Path("rag_store") # FAISS index + docstore folder
+    _registry_save_path = Path("rag_store.meta.json") # Document registry sidecar
+    _write_lock = threading.Lock() # Serializes add_document mutations
+    _dirty = False # True when in-memory state is ahead of the on-disk store
+    _ingest_queue: Optional[asyncio.Queue] = None # Pending background ingestions
+    # Replays identical (or near-identical) questions from memory instead of
+    # re-running retrieval and generation; cleared whenever the corpus changes.
+    _query_cache = QueryCache(capacity=512, ttl_seconds=600.0)
 
     
     def __new__(cls):
+        # Double-checked locking: the unlocked read serves every call after
+        # the first, and the re-check under the lock stops two threads that
+        # both saw None from building two services.
         if cls._instance is None:
-            cls._instance = super(RAGService, cls).__new__(cls)
+            with _instance_lock:
+                if cls._instance is None:
+                    cls._instance = super(RAGService, cls).__new__(cls)
         return cls._instance
     
     def __init__(self):
         if not hasattr(self, '_initialized'):
             self._initialized = True
             settings.upload_dir.mkdir(exist_ok=True)
+            # Coalesces concurrent retrievals into single batched FAISS calls.
+            self._search_batcher = SearchBatcher(self._get_vector_store)
+
+    def _get_vector_store(self):
+        if self._rag_runner is None or self._rag_runner.vector_store is None:
+            raise RuntimeError("No documents have been indexed yet.")
+        return self._rag_runner.vector_store
+
+    async def _aretrieve_chunks(self, question: str) -> list:
+        """
+        Batched, non-blocking counterpart of
+        `RAGRunner._retrieve_context_chunks`: the query joins the next
+        micro-batch instead of running its own FAISS search on the event
+        loop, and the raw (document, score) hits come back as a list so
+        callers never round-trip through a joined-and-resplit string.
+        """
+        if self._rag_runner is None or self._rag_runner.vector_store is None:
+            return []
+        try:
+            return await self._search_batcher.search(
+                question, self._rag_runner.config.retrieval_k
+            )
+        except Exception as e:
+            if self._rag_runner.config.debug:
+                print(f"[DEBUG] Error retrieving context: {e}")
+            return []
+
+    async def _aretrieve_context(self, question: str) -> str:
+        """Joined-string variant of `_aretrieve_chunks` for prompt building."""
+        results = await self._aretrieve_chunks(question)
+        return "\n\n".join(doc.page_content for doc, score in results)
     
     def _save_runner(self):
-        """Saves the RAG runner instance to disk."""
+        """
+        Persists the vector store via FAISS's native serializer plus a JSON
+        sidecar for the document registry.
+
+        Only the index and docstore hit disk; the chat model and embedding
+        handles are cheap to reconstruct and were the expensive part of the
+        old whole-runner pickle.
+        """
         if self._rag_runner:
-            with open(self._runner_save_path, "wb") as f:
-                pickle.dump(self._rag_runner, f)
-
-    def _load_runner(self):
-        """Loads the RAG runner instance from disk if it exists."""
-        if self._runner_save_path.exists():
-            with open(self._runner_save_path, "rb") as f:
-                self._rag_runner = pickle.load(f)
+            # Write to temporaries and os.replace into place, so a reader
+            # (or a crash mid-write) never sees a partial file.
+            tmp_dir = self._store_save_path.with_suffix(".tmp")
+            self._rag_runner.save(str(tmp_dir))
+            self._store_save_path.mkdir(exist_ok=True)
+            for name in os.listdir(tmp_dir):
+                os.replace(tmp_dir / name, self._store_save_path / name)
+            tmp_dir.rmdir()
+
+            tmp_registry = self._registry_save_path.with_suffix(".json.tmp")
+            tmp_registry.write_bytes(orjson.dumps(self._document_registry))
+            os.replace(tmp_registry, self._registry_save_path)
+
+    def flush_if_dirty(self):
+        """Writes the store to disk if anything changed since the last flush."""
+        with self._write_lock:
+            if not RAGService._dirty:
+                return
+            self._save_runner()
+            RAGService._dirty = False
+
+    async def flush_runner_periodically(self, interval_seconds: float = 5.0):
+        """
+        Coalesces store writes into a periodic background flush.
+
+        Uploads only flip the dirty flag, so a burst of adds costs one disk
+        write instead of one per document. Runs until cancelled; the final
+        flush on cancellation covers anything still pending at shutdown.
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                await asyncio.to_thread(self.flush_if_dirty)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.flush_if_dirty)
+            raise
+
+    def _load_runner(self, force: bool = False):
+        """
+        Loads the RAG runner from disk once; later calls reuse the in-memory
+        instance. The FAISS index is read with `faiss.read_index` (through
+        `FAISSVectorStore.load_local`) and the rest of the runner — chat
+        model, embeddings, config — is built fresh instead of unpickled.
+        """
+        if RAGService._runner_loaded and not force:
+            return
+        if (self._store_save_path / "index.faiss").exists():
+            embeddings = get_local_embeddings()
+            # mmap lets the kernel page vectors in on demand instead of
+            # reading the whole index into RAM at startup, and shares the
+            # mapped pages across forked uvicorn workers.
+            vector_store = FAISSVectorStore.load_local(
+                str(self._store_save_path), embeddings=embeddings, mmap=True
+            )
+            config = RAGConfig(
+                chunk_size=settings.chunk_size,
+                chunk_overlap=settings.chunk_overlap,
+                retrieval_k=settings.retrieval_k,
+                debug=settings.debug,
+                embeddings=embeddings,
+                vector_store=vector_store,
+            )
+            self._rag_runner = RAGRunner(config).setup()
+            if self._registry_save_path.exists():
+                RAGService._document_registry = orjson.loads(
+                    self._registry_save_path.read_bytes()
+                )
+                RAGService._file_paths = {
+                    doc['file_path'] for doc in self._document_registry.values()
+                }
         else:
             self._rag_runner = None
+        RAGService._runner_loaded = True
 
     def add_document(self, file_path: Path) -> dict:
         """Add a document and save the updated runner."""
-        # Load the latest runner before adding to it
+        with self._write_lock:
+            return self._add_document_locked(file_path)
+
+    async def add_document_async(self, file_path: Path) -> dict:
+        """
+        Queues a document for background ingestion and returns immediately.
+
+        The upload handler only pays for registering the job; parsing,
+        chunking, embedding, and indexing happen in the worker started by
+        `process_ingest_queue`. Poll the registry (or the status endpoint)
+        for `queued` -> `processing` -> `ready` / `failed`.
+        """
+        document_id = str(uuid.uuid4())
+        self._document_registry[document_id] = {
+            'document_id': document_id,
+            'file_path': str(file_path),
+            'document_type': self._detect_document_type(file_path),
+            'upload_time': time.time(),
+            'file_size': file_path.stat().st_size,
+            'status': 'queued',
+        }
+        self._file_paths.add(str(file_path))
+        if self._ingest_queue is None:
+            RAGService._ingest_queue = asyncio.Queue()
+        await self._ingest_queue.put((document_id, file_path))
+        return {'document_id': document_id, 'status': 'queued'}
+
+    async def process_ingest_queue(self):
+        """Worker coroutine: pops queued uploads and ingests them off the loop."""
+        if self._ingest_queue is None:
+            RAGService._ingest_queue = asyncio.Queue()
+        while True:
+            document_id, file_path = await self._ingest_queue.get()
+            entry = self._document_registry.get(document_id)
+            if entry is None:
+                continue
+            entry['status'] = 'processing'
+            try:
+                await asyncio.to_thread(self._ingest_sync, document_id, file_path)
+                entry['status'] = 'ready'
+            except Exception as e:
+                entry['status'] = 'failed'
+                entry['error'] = str(e)
+
+    def _ingest_sync(self, document_id: str, file_path: Path) -> None:
+        """Runs the heavy ingestion pipeline for one queued document."""
+        with self._write_lock:
+            self._load_runner()
+            if self._rag_runner is None:
+                self._rag_runner = create_smart_rag(
+                    knowledge_files=[str(file_path)],
+                    chunk_size=settings.chunk_size,
+                    chunk_overlap=settings.chunk_overlap,
+                    retrieval_k=settings.retrieval_k,
+                    debug=settings.debug,
+                    embeddings=get_local_embeddings()
+                )
+                chunks_created = len(self._rag_runner.vector_store) # type: ignore
+            else:
+                chunks_created = self._rag_runner.add_files([str(file_path)])
+            self._document_registry[document_id]['chunks_created'] = chunks_created
+            RAGService._dirty = True
+            self._query_cache.clear()
+
+    def get_document_status(self, document_id: str) -> Optional[dict]:
+        """Returns the registry entry for a document, or None if unknown."""
+        return self._document_registry.get(document_id)
+
+    def _add_document_locked(self, file_path: Path) -> dict:
+        # The runner is loaded lazily on first use and then mutated in place.
         self._load_runner()
         document_id = str(uuid.uuid4())
         doc_type = self._detect_document_type(file_path)
-        
+
         try:
             # Create or update RAG runner with new document
             if self._rag_runner is None:
                 self._rag_runner = create_smart_rag(
                     knowledge_files=[str(file_path)],
+                    chunk_size=settings.chunk_size,
+                    chunk_overlap=settings.chunk_overlap,
                     retrieval_k=settings.retrieval_k,
-                    debug=settings.debug
+                    debug=settings.debug,
+                    embeddings=get_local_embeddings()
                 )
+                chunks_created = len(self._rag_runner.vector_store)  # type: ignore
             else:
-                # For simplicity, recreate with all documents
-                # In production, you'd want incremental updates
-                all_files = [doc['file_path'] for doc in self._document_registry.values()]
-                all_files.append(str(file_path))
-                
-                self._rag_runner = create_smart_rag(
-                    knowledge_files=all_files,
-                    retrieval_k=settings.retrieval_k,
-                    debug=settings.debug
-                )
+                # Incremental update: only the new file is loaded, split,
+                # and embedded; its vectors are appended to the live index
+                # instead of re-embedding the whole corpus.
+                chunks_created = self._rag_runner.add_files([str(file_path)])
             
             # Register the document
             doc_info = {
@@ -82,22 +297,27 @@ class RAGService:
                 'file_path': str(file_path),
                 'document_type': doc_type,
                 'upload_time': time.time(),
-                'file_size': file_path.stat().st_size
+                'file_size': file_path.stat().st_size,
+                'chunks_created': chunks_created,
             }
             
             self._document_registry[document_id] = doc_info
-            self._save_runner()
+            self._file_paths.add(str(file_path))
+            # Deferred: the background flusher persists the store shortly,
+            # keeping multi-megabyte disk writes out of the upload path.
+            RAGService._dirty = True
+            self._query_cache.clear() # Cached answers may now be stale
         
             return {
                 'document_id': document_id,
                 'document_type': doc_type,
-                'chunks_created': self._estimate_chunks(file_path)
+                'chunks_created': chunks_created
             }
             
         except Exception as e:
             raise RuntimeError(f"Failed to process document: {str(e)}")
     
-    async def stream_chat(self, question: str) -> AsyncGenerator[str, None]:
+    async def stream_chat(self, question: str) -> AsyncGenerator[bytes, None]:
         """Streams a direct response from the LLM without RAG."""
         # We must load the runner to see if a model is available.
         self._load_runner()
@@ -111,31 +331,34 @@ class RAGService:
             messages.insert(0, SystemMessage(content=self._rag_runner.config.system_prompt)) # type: ignore
         
         try:
-            for chunk in self._rag_runner.chat_model.stream(messages): # type: ignore
-                yield f'0: "{json.dumps(chunk)}"\n'
+            async for chunk in aiter_sync(self._rag_runner.chat_model.stream(messages)): # type: ignore
+                yield b'0: ' + orjson.dumps(chunk) + b'\n'
         except Exception as e:
             error_message = f"Error during chat generation: {str(e)}"
-            yield f'0: "{json.dumps(error_message)}"\n'
-    def query(self, question: str, include_context: bool = True, retrieval_k: int = None) -> dict: # type: ignore
+            yield b'0: ' + orjson.dumps(error_message) + b'\n'
+    def query(self, question: str, include_context: bool = True, retrieval_k: int = None, nprobe: int = None) -> dict: # type: ignore
         """Query the RAG system"""
         if self._rag_runner is None:
             raise RuntimeError("No documents loaded. Upload documents first.")
-        
+
         start_time = time.time()
-        
+
         try:
-            # Update retrieval_k if provided
-            if retrieval_k:
-                self._rag_runner.config.retrieval_k = retrieval_k
-            
-            answer = self._rag_runner.query(question, include_context=include_context)
-            processing_time = time.time() - start_time
-            
-            # Get retrieved chunks for transparency (optional)
+            # One retrieval serves both the prompt and the surfaced chunks;
+            # previously a second FAISS search ran just for transparency.
             retrieved_chunks = None
             if include_context:
-                context = self._rag_runner._retrieve_context(question)
-                retrieved_chunks = context.split('\n\n') if context else []
+                # retrieval_k and nprobe ride along per call; poking them
+                # into the shared config/index let concurrent requests
+                # clobber each other's settings.
+                answer, retrieved_docs = self._rag_runner.query(
+                    question, include_context=True, return_retrieved=True,
+                    retrieval_k=retrieval_k, nprobe=nprobe,
+                )
+                retrieved_chunks = [doc.page_content for doc in retrieved_docs]
+            else:
+                answer = self._rag_runner.query(question, include_context=False)
+            processing_time = time.time() - start_time
             
             return {
                 'answer': answer,
@@ -156,25 +379,8 @@ class RAGService:
     
     def _detect_document_type(self, file_path: Path) -> DocumentType:
         """Detect document type from file extension"""
-        ext = file_path.suffix.lower()
-        if ext == '.pdf':
-            return DocumentType.PDF
-        elif ext == '.md':
-            return DocumentType.MARKDOWN
-        elif ext == '.py':
-            return DocumentType.PYTHON
-        else:
-            return DocumentType.TEXT
-    
-    def _estimate_chunks(self, file_path: Path) -> int:
-        """Rough estimate of chunks created (for API response)"""
-        try:
-            file_size = file_path.stat().st_size
-            # Rough estimate: 1 chunk per ~1KB for text files
-            return max(1, file_size // 1000)
-        except:
-            return 1
-        
+        return _EXT_MAP.get(file_path.suffix.lower(), _DEFAULT_DOC_TYPE)
+
     async def stream_query(self, question: str, include_context: bool = True) -> AsyncGenerator[str, None]:
         """Streams the RAG response token by token."""
         if self._rag_runner is None or self._rag_runner.chat_model is None:
@@ -183,8 +389,8 @@ class RAGService:
         
         context = ""
         if include_context:
-            context = self._rag_runner._retrieve_context(question)
-        
+            context = await self._aretrieve_context(question)
+
         enhanced_message = f"Context:\n{context}\n\nQuestion: {question}" if context else question
         
         messages = []
@@ -194,8 +400,8 @@ class RAGService:
         messages.append(HumanMessage(content=enhanced_message))
         
         try:
-            # Use the model's stream method and yield each chunk
-            for chunk in self._rag_runner.chat_model.stream(messages):
+            # Stream from a worker thread so the event loop stays free
+            async for chunk in aiter_sync(self._rag_runner.chat_model.stream(messages)):
                 yield chunk
                 
         except Exception as e:
@@ -205,27 +411,56 @@ class RAGService:
             yield f"Error during generation: {str(e)}"
 
 
-    async def stream_query_with_sources(self, question: str) -> AsyncGenerator[str, None]:
+    async def stream_query_with_sources(self, question: str) -> AsyncGenerator[bytes, None]:
         """Streams the RAG response, yielding sources first, then the answer."""
         self._load_runner()
         
         if self._rag_runner is None:
             # This is now the only check we need.
             raise RuntimeError("No documents have been indexed. Please upload a document first.")
-        
+
+        # --- 0. Cache Lookup ---
+        # Repeat questions (exact or semantically close) replay the stored
+        # frames without touching the vector store or the model. The question
+        # is embedded once, off the event loop, and the same vector serves
+        # both the cache probe and the retrieval below.
+        question_embedding = None
+        if self._rag_runner.vector_store is not None:
+            question_embedding = await asyncio.to_thread(
+                self._rag_runner.vector_store.embedding_function.embed_query,
+                question,
+            )
+        cached = self._query_cache.get(question, embedding=question_embedding)
+        if cached is not None:
+            for frame in cached.frames:
+                yield frame
+            return
+        frames = [] # Collected for the cache as they stream out
+
         # --- 1. Retrieve Context and Yield as Sources ---
-        context_chunks = []
-        context = self._rag_runner._retrieve_context(question)
-        if context:
-            context_chunks = context.split('\n\n')
-            for i, chunk in enumerate(context_chunks):
-                # The Vercel AI SDK expects a specific data prefix format for non-text parts.
-                # 2 is the code for 'data' parts. We'll send JSON.
-                source_data = json.dumps({
-                    "type": "source-url",
-                    "text": chunk.strip() # We put the chunk text here for display
-                })
-                yield f'2: {source_data}\n'
+        # Search with the vector from the cache probe instead of going back
+        # through the batcher, which would embed the question a second time.
+        if question_embedding is not None:
+            retrieved = await asyncio.to_thread(
+                self._rag_runner.vector_store.similarity_search_by_vector,
+                question_embedding,
+                self._rag_runner.config.retrieval_k,
+            )
+        else:
+            retrieved = []
+        for doc, score in retrieved:
+            # The Vercel AI SDK expects a specific data prefix format for non-text parts.
+            # 2 is the code for 'data' parts. We'll send JSON.
+            source_data = orjson.dumps({
+                "type": "source-url",
+                "text": doc.page_content.strip() # We put the chunk text here for display
+            })
+            frame = b'2: ' + source_data + b'\n'
+            frames.append(frame)
+            yield frame
+
+        # Join once, only for the LLM prompt.
+        context = "\n\n".join(doc.page_content for doc, score in retrieved)
                 
         
         # --- 2. Prepare Prompt and Yield the LLM Answer ---
@@ -239,20 +474,30 @@ class RAGService:
         
         try:
             is_reasoning = False
-            for chunk in self._rag_runner.chat_model.stream(messages): # type: ignore
-                if '<think>' in chunk:
-                    is_reasoning = True
-                    chunk = chunk.replace('<think>', '')
-                if '</think>' in chunk:
-                    is_reasoning = False
-                    chunk = chunk.replace('</think>', '')
-                
-                if is_reasoning and chunk.strip():
-                    reasoning_obj = {"type": "reasoning", "delta": chunk}
-                    yield f"{json.dumps(reasoning_obj)}\n"
-                elif chunk.strip():
-                    text_obj = {"type": "text", "delta": chunk}
-                    yield f"{json.dumps(text_obj)}\n"
+            async for chunk in aiter_sync(self._rag_runner.chat_model.stream(messages)): # type: ignore
+                # Fast path: most chunks carry no tags, so one substring
+                # check skips the regex machinery entirely.
+                if '<' not in chunk:
+                    if chunk.strip():
+                        prefix = _REASONING_PREFIX if is_reasoning else _TEXT_PREFIX
+                        frame = prefix + orjson.dumps(chunk) + _FRAME_SUFFIX
+                        frames.append(frame)
+                        yield frame
+                    continue
+                # Split on the precompiled pattern once; tags flip the state,
+                # other segments are emitted under the current state.
+                for segment in _THINK_TAG_RE.split(chunk):
+                    if segment == '<think>':
+                        is_reasoning = True
+                    elif segment == '</think>':
+                        is_reasoning = False
+                    elif segment.strip():
+                        prefix = _REASONING_PREFIX if is_reasoning else _TEXT_PREFIX
+                        frame = prefix + orjson.dumps(segment) + _FRAME_SUFFIX
+                        frames.append(frame)
+                        yield frame
+            # Only complete responses are cached; failures fall through.
+            self._query_cache.put(question, frames, embedding=question_embedding)
         except Exception as e:
             error_obj = {"type": "error", "message": str(e)}
-            yield f"{json.dumps(error_obj)}\n"
+            yield orjson.dumps(error_obj) + b"\n"
@@ -0,0 +1,76 @@
+# File: app/search_batcher.py
+"""
+Micro-batches concurrent vector searches into single FAISS calls.
+
+Each awaiting request parks a future on a queue; a background flusher
+collects whatever arrives within a short window (or until the batch is
+full) and issues one batched `similarity_search_batch` call. FAISS scans
+clusters once for the whole (n, d) query matrix, which is far cheaper
+than n independent searches under concurrent load.
+"""
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class SearchBatcher:
+    """Coalesces concurrent similarity searches against one vector store."""
+
+    def __init__(
+        self,
+        get_vector_store: Callable[[], Any],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+    ):
+        self._get_vector_store = get_vector_store
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def search(self, question: str, k: int) -> List[Tuple[Any, float]]:
+        """
+        Queues a query and awaits its row of the next batched search.
+
+        Returns the same (document, score) tuples as `similarity_search`.
+        """
+        loop = asyncio.get_running_loop()
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_loop())
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((question, k, future))
+        return await future
+
+    async def _flush_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Block for the first request, then sweep up everything else
+            # that arrives inside the batching window.
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            questions = [question for question, _, _ in batch]
+            batch_k = max(k for _, k, _ in batch)
+            try:
+                store = self._get_vector_store()
+                results = await asyncio.to_thread(
+                    store.similarity_search_batch, questions, batch_k
+                )
+            except Exception as exc:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, k, future), rows in zip(batch, results):
+                if not future.done():
+                    future.set_result(rows[:k])
@@ -0,0 +1,53 @@
+# File: app/streaming.py
+"""
+Bridge between the blocking chat-model stream and the async endpoints.
+
+`chat_model.stream(...)` is a synchronous generator: iterating it inside an
+`async def` pins the event loop for the whole generation, stalling every
+other request. `aiter_sync` runs the producer in a worker thread and hands
+chunks back through an asyncio.Queue, so streams from multiple clients can
+interleave.
+"""
+import asyncio
+from typing import AsyncGenerator, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_SENTINEL = object()
+
+
+class _RaisedInProducer:
+    """Carries an exception from the producer thread to the async consumer."""
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def aiter_sync(sync_iterable: Iterable[T]) -> AsyncGenerator[T, None]:
+    """
+    Iterates a blocking iterable in a worker thread, yielding asynchronously.
+
+    Exceptions raised by the producer are re-raised in the consuming task.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def _produce():
+        try:
+            for item in sync_iterable:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as exc:  # noqa: BLE001 - forwarded to the consumer
+            loop.call_soon_threadsafe(queue.put_nowait, _RaisedInProducer(exc))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _SENTINEL)
+
+    producer = loop.run_in_executor(None, _produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _SENTINEL:
+                break
+            if isinstance(item, _RaisedInProducer):
+                raise item.exc
+            yield item
+    finally:
+        await producer
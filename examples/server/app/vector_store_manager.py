@@ -1,24 +1,52 @@
 # File: app/vector_store_manager.py
 import sys
 import os
+import threading
+from pathlib import Path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../src')))
 from chain.vectors import FAISSVectorStore
-from chain.embeddings import LocalEmbeddings
+
+from .deps import get_local_embeddings
+
+# Guards singleton construction; the post-init fast path never takes it.
+_instance_lock = threading.Lock()
+
+# FAISS index + docstore folder; reloaded on startup so a restart doesn't
+# force re-embedding everything that was already ingested.
+_SAVE_PATH = Path("vector_store")
+
 
 class VectorStoreManager:
     _instance = None
     _vector_store = None
 
     def __new__(cls):
+        # Double-checked locking: without the re-check under the lock, two
+        # first-requests racing here would each build a FAISSVectorStore
+        # and load the embedding backend twice.
         if cls._instance is None:
-            cls._instance = super(VectorStoreManager, cls).__new__(cls)
-            # Initialize the vector store once
-            embeddings = LocalEmbeddings()
-            cls._vector_store = FAISSVectorStore(embeddings=embeddings)
+            with _instance_lock:
+                if cls._instance is None:
+                    instance = super(VectorStoreManager, cls).__new__(cls)
+                    # Share the process-wide embedding backend instead of
+                    # loading a second copy of the model for this store.
+                    embeddings = get_local_embeddings()
+                    if (_SAVE_PATH / "index.faiss").exists():
+                        cls._vector_store = FAISSVectorStore.load_local(
+                            str(_SAVE_PATH), embeddings=embeddings, mmap=True
+                        )
+                    else:
+                        cls._vector_store = FAISSVectorStore(embeddings=embeddings)
+                    cls._instance = instance
         return cls._instance
 
     def get_vector_store(self):
         return self._vector_store
 
+    def save(self):
+        """Persists the store so the next process start skips re-embedding."""
+        if self._vector_store is not None and self._vector_store.index is not None:
+            self._vector_store.save_local(str(_SAVE_PATH))
+
 # Create a singleton instance
-vector_store_manager = VectorStoreManager()
\ No newline at end of file
+vector_store_manager = VectorStoreManager()
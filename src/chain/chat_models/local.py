@@ -1,6 +1,6 @@
 # src/chain/chat_models/local.py
 from typing import Any, Dict, Union, List, Iterator
-from openai import OpenAI
+from ..core.clients import get_openai_client
 from .base import BaseChatModel, LocalChatConfig
 from ..core.types import BaseMessage, SystemMessage, HumanMessage, AIMessage, ChatResult, TokenUsage
 
@@ -8,7 +8,8 @@ class LocalChatModel(BaseChatModel):
     """A self-contained chat model for local, OpenAI-compatible servers."""
     def __init__(self, config: LocalChatConfig, **kwargs: Any):
         super().__init__(config=config, **kwargs)
-        self.client = OpenAI(base_url=config.base_url, api_key=config.api_key)
+        # Shared per-server client (same pool as LocalEmbeddings).
+        self.client = get_openai_client(config.base_url, config.api_key)
         self.model_name = config.model
         self.temperature = config.temperature
         self.max_tokens = config.max_tokens
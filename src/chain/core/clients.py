@@ -0,0 +1,62 @@
+# src/chain/core/clients.py
+"""
+Shared OpenAI-compatible HTTP clients for local servers.
+
+Every `LocalEmbeddings` / `LocalChatModel` instance used to build its own
+`OpenAI` client, each with its own connection pool, so a script mixing
+embedding and chat calls against the same LM Studio server kept opening
+fresh TCP connections. Caching one client per (base_url, api_key) pair lets
+all callers reuse the same keep-alive pool.
+
+The underlying httpx transports are configured with a larger pool than the
+SDK default, so concurrent fan-out (batched embeddings, parallel queries)
+multiplexes over warm connections instead of queuing on pool limits. HTTP/2
+is enabled when the optional `h2` package is installed, coalescing those
+concurrent requests onto fewer connections.
+"""
+from typing import Dict, Tuple
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+_sync_clients: Dict[Tuple[str, str], OpenAI] = {}
+_async_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+
+
+def _http2_available() -> bool:
+    """True when httpx's optional HTTP/2 support can be enabled."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+_HTTP2 = _http2_available()
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# Mirror the OpenAI SDK's defaults; a custom http_client replaces them.
+_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+
+def get_openai_client(base_url: str, api_key: str) -> OpenAI:
+    """Returns a shared synchronous client for the given server."""
+    key = (base_url, api_key)
+    client = _sync_clients.get(key)
+    if client is None:
+        http_client = httpx.Client(http2=_HTTP2, limits=_LIMITS, timeout=_TIMEOUT)
+        client = _sync_clients.setdefault(
+            key, OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+        )
+    return client
+
+
+def get_async_openai_client(base_url: str, api_key: str) -> AsyncOpenAI:
+    """Returns a shared asynchronous client for the given server."""
+    key = (base_url, api_key)
+    client = _async_clients.get(key)
+    if client is None:
+        http_client = httpx.AsyncClient(http2=_HTTP2, limits=_LIMITS, timeout=_TIMEOUT)
+        client = _async_clients.setdefault(
+            key, AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+        )
+    return client
@@ -8,6 +8,10 @@ The key components exposed are:
     - AzureOpenAIEmbeddings: For generating embeddings using Azure OpenAI.
     - LocalEmbeddings: For generating embeddings using a local, OpenAI-compatible
       server like LM Studio.
+    - ONNXEmbeddings: For running an embedding model in-process with ONNX
+      Runtime (optional, requires `chain-ai[onnx]`).
+    - HuggingFaceEmbeddings: For running a sentence-transformers model
+      in-process (optional, requires `chain-ai[huggingface]`).
 """
 from dotenv import load_dotenv
 from .base import BaseEmbeddings
@@ -19,4 +23,28 @@ __all__ = [
     "BaseEmbeddings",
     "AzureOpenAIEmbeddings",
     "LocalEmbeddings",
-]
\ No newline at end of file
+]
+
+# --- Graceful import for ONNX Runtime ---
+try:
+    from .onnx import ONNXEmbeddings # type: ignore
+    __all__.append("ONNXEmbeddings")
+except ImportError:
+    class ONNXEmbeddings:
+        def __init__(self, *args, **kwargs):
+            raise ImportError(
+                "ONNX dependencies not found. Please run `pip install chain-ai[onnx]` "
+                "to use ONNXEmbeddings."
+            )
+
+# --- Graceful import for sentence-transformers ---
+try:
+    from .huggingface import HuggingFaceEmbeddings # type: ignore
+    __all__.append("HuggingFaceEmbeddings")
+except ImportError:
+    class HuggingFaceEmbeddings:
+        def __init__(self, *args, **kwargs):
+            raise ImportError(
+                "sentence-transformers not found. Please run `pip install "
+                "chain-ai[huggingface]` to use HuggingFaceEmbeddings."
+            )
\ No newline at end of file
@@ -3,7 +3,7 @@
 Implementation for Azure OpenAI embedding models.
 """
 import os
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from chain.embeddings.openai import OpenAILikeEmbeddings # Inherit from our new base class
 from dotenv import load_dotenv
 load_dotenv()
@@ -33,6 +33,12 @@ class AzureOpenAIEmbeddings(OpenAILikeEmbeddings):
             azure_endpoint=azure_endpoint,
             api_key=api_key,
         )
+        # Native async client for the aembed_* methods.
+        self.async_client = AsyncAzureOpenAI(
+            api_version=api_version,
+            azure_endpoint=azure_endpoint,
+            api_key=api_key,
+        )
         # The 'model_name' attribute is used by the base class for the API call.
         # For Azure, this is the deployment name.
         self.model_name = deployment_name
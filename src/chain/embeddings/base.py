@@ -3,6 +3,7 @@
 Base embeddings interface
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -39,6 +40,62 @@ class BaseEmbeddings(ABC):
         """
         pass
 
+    def embed_documents_np(self, texts: List[str]):
+        """
+        Embed a list of documents as a contiguous float32 NumPy array.
+
+        Vector stores hand embeddings straight to numeric backends (FAISS
+        wants an (n, d) float32 matrix), so round-tripping through nested
+        Python lists boxes every float just to unbox it again. The default
+        converts the list-based result once; backends that already produce
+        arrays should override this to skip the lists entirely.
+        """
+        # Imported here: numpy ships with the vector-store extras, not the
+        # core package, and only array-consuming callers reach this method.
+        import numpy as np
+        return np.asarray(self.embed_documents(texts), dtype=np.float32)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Asynchronously embed a list of documents.
+
+        The default implementation runs the synchronous `embed_documents` in a
+        worker thread. Providers with a native async client should override this.
+        """
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Asynchronously embed a single query text.
+
+        The default implementation runs the synchronous `embed_query` in a
+        worker thread. Providers with a native async client should override this.
+        """
+        return await asyncio.to_thread(self.embed_query, text)
+
+    async def aembed_queries(self, texts: List[str], max_concurrency: int = 5) -> List[List[float]]:
+        """
+        Embed several independent query texts concurrently.
+
+        Fans the queries out with `asyncio.gather` while a semaphore caps the
+        number of in-flight requests, so the total latency approaches the
+        slowest single round-trip instead of the sum of all of them.
+
+        Args:
+            texts: The query texts to embed.
+            max_concurrency: Maximum number of concurrent embedding requests.
+
+        Returns:
+            The embeddings, in the same order as the input texts.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _embed(text: str) -> List[float]:
+            async with semaphore:
+                return await self.aembed_query(text)
+
+        return await asyncio.gather(*(_embed(text) for text in texts))
+
     def __call__(self, text: str) -> List[float]:
         """Syntactic sugar for embed_query."""
         return self.embed_query(text)
\ No newline at end of file
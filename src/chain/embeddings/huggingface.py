@@ -0,0 +1,155 @@
+# src/chain/embeddings/huggingface.py
+"""
+Implementation for in-process embedding models via sentence-transformers.
+"""
+import os
+from typing import List, Optional
+
+try:
+    import torch
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    raise ImportError(
+        "sentence-transformers not found. Please run `pip install "
+        "chain-ai[huggingface]` to use HuggingFaceEmbeddings."
+    )
+
+from .base import BaseEmbeddings
+
+
+class HuggingFaceEmbeddings(BaseEmbeddings):
+    """
+    Runs a sentence-transformers model in-process.
+
+    Like `ONNXEmbeddings`, this avoids the HTTP round-trip of
+    `LocalEmbeddings`; unlike it, the model runs through the standard
+    sentence-transformers stack, so any Hub checkpoint works without an
+    export step.
+
+    Document batches are encoded with length bucketing: texts are sorted
+    by token length before batching, so each mini-batch pads only to its
+    own longest member instead of the longest text in the whole list, and
+    results are scattered back to input order afterwards. This is purely a
+    data-layout change with no effect on the returned vectors.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        batch_size: int = 64,
+        num_threads: Optional[int] = None,
+        device: Optional[str] = None,
+        fp16: bool = False,
+    ):
+        """
+        Initializes the sentence-transformers model.
+
+        Args:
+            model_name (str): A sentence-transformers model id or local path.
+            batch_size (int): Number of texts per encode call.
+            num_threads (int): Intra-op thread count for CPU inference.
+                Defaults to the machine's core count; PyTorch's own default
+                is frequently mis-sized inside containers.
+            device (str): Target device ("cuda", "mps", "cpu"). Defaults to
+                the best available accelerator.
+            fp16 (bool): Run the model in half precision on CUDA. Halves
+                activation bandwidth with negligible cosine error; ignored
+                on CPU/MPS where fp16 kernels are slower or unsupported.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        if device is None:
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+        self.device = device
+        if device == "cpu":
+            torch.set_num_threads(num_threads or os.cpu_count() or 1)
+        self.model = SentenceTransformer(model_name, device=device)
+        if fp16 and device == "cuda":
+            self.model.half()
+        # Worker pool for sharding very large batches across all visible
+        # GPUs (or CPU processes). Created lazily on the first oversized
+        # batch; small batches skip it because the IPC overhead would
+        # outweigh single-device encode.
+        self._pool = None
+        self.multi_process_threshold = 512
+        # Inference only: drop dropout/batch-norm training behavior and make
+        # sure autograd never records the forward pass (see inference_mode
+        # around the encode calls below).
+        self.model.eval()
+
+    def _token_length(self, text: str) -> int:
+        """Approximate token length used only for bucketing, never truncation."""
+        try:
+            return len(self.model.tokenizer.tokenize(text))
+        except Exception:
+            # Bucketing is an optimization; character length is a fine proxy
+            # if the tokenizer is unavailable or chokes on an input.
+            return len(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a list of documents with length-bucketed batching.
+        """
+        return self.embed_documents_np(texts).tolist()
+
+    def embed_documents_np(self, texts: List[str]):
+        """
+        Embeds documents straight into a float32 NumPy array.
+
+        sentence-transformers already returns an ndarray, so array-consuming
+        callers (the FAISS store) skip the list round-trip entirely.
+        """
+        import numpy as np
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        processed_texts = [text.strip() or " " for text in texts]
+
+        # Sort by token length so padding within each mini-batch is minimal,
+        # then un-permute the encoded vectors back to input order.
+        order = sorted(range(len(processed_texts)),
+                       key=lambda i: self._token_length(processed_texts[i]))
+        sorted_texts = [processed_texts[i] for i in order]
+        if len(sorted_texts) > self.multi_process_threshold:
+            if self._pool is None:
+                self._pool = self.model.start_multi_process_pool()
+            encoded = self.model.encode_multi_process(
+                sorted_texts,
+                self._pool,
+                batch_size=self.batch_size,
+            )
+        else:
+            with torch.inference_mode():
+                encoded = self.model.encode(
+                    sorted_texts,
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                )
+
+        out = np.empty((len(processed_texts), encoded.shape[1]), dtype=np.float32)
+        out[np.asarray(order)] = encoded
+        return out
+
+    def __del__(self):
+        pool, self._pool = getattr(self, "_pool", None), None
+        if pool is not None:
+            try:
+                SentenceTransformer.stop_multi_process_pool(pool)
+            except Exception:
+                pass  # Interpreter shutdown; workers die with the process.
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embeds a single query."""
+        with torch.inference_mode():
+            return self.model.encode(
+                [text.strip() or " "],
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )[0].tolist()
@@ -2,7 +2,7 @@
 """
 Implementation for local embedding models served via an OpenAI-compatible API.
 """
-from openai import OpenAI
+from ..core.clients import get_openai_client, get_async_openai_client
 from .openai import OpenAILikeEmbeddings # Correctly inherit from our robust base class
 
 class LocalEmbeddings(OpenAILikeEmbeddings):
@@ -26,6 +26,11 @@ class LocalEmbeddings(OpenAILikeEmbeddings):
             base_url (str): The base URL of the local server API.
             api_key (str): The API key (often unused for local servers).
         """
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
+        # Shared per-server clients, so embeddings and chat models reuse one
+        # keep-alive connection pool instead of handshaking per instance.
+        self.client = get_openai_client(base_url, api_key)
+        # Native async client so `aembed_query`/`aembed_queries` can fan out
+        # concurrent requests instead of blocking on one round-trip at a time.
+        self.async_client = get_async_openai_client(base_url, api_key)
         # This attribute is used by the OpenAILikeEmbeddings base class.
         self.model_name = model_name
@@ -0,0 +1,139 @@
+# src/chain/embeddings/onnx.py
+"""
+Implementation for in-process embedding models running on ONNX Runtime.
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:
+    raise ImportError(
+        "ONNX dependencies not found. Please run `pip install chain-ai[onnx]` "
+        "to use ONNXEmbeddings."
+    )
+
+from .base import BaseEmbeddings
+
+
+class ONNXEmbeddings(BaseEmbeddings):
+    """
+    Runs a sentence-embedding model (e.g., Nomic, BGE) in-process with
+    ONNX Runtime.
+
+    Unlike `LocalEmbeddings`, which pays an HTTP+JSON round-trip to a local
+    server for every call, this class executes the model directly, so batch
+    embedding is bounded by compute rather than per-request overhead. With
+    `quantize=True` (the default) the model weights are dynamically quantized
+    to INT8 on first use and the quantized copy is cached next to the
+    original, trading a small amount of accuracy for faster CPU matmuls.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: Optional[str] = None,
+        quantize: bool = True,
+        max_length: int = 512,
+        batch_size: int = 32,
+    ):
+        """
+        Initializes the ONNX embedding session.
+
+        Args:
+            model_path (str): Path to the exported `model.onnx` file.
+            tokenizer_path (str): Path to the matching `tokenizer.json`.
+                Defaults to a `tokenizer.json` beside the model file.
+            quantize (bool): Apply dynamic INT8 quantization on first use and
+                cache the result to disk.
+            max_length (int): Maximum token length per input text.
+            batch_size (int): Number of texts per inference call.
+        """
+        if tokenizer_path is None:
+            tokenizer_path = os.path.join(os.path.dirname(model_path), "tokenizer.json")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+        if not os.path.exists(tokenizer_path):
+            raise FileNotFoundError(f"Tokenizer file not found: {tokenizer_path}")
+
+        if quantize:
+            model_path = self._quantized_model_path(model_path)
+
+        self.model_name = os.path.basename(model_path)
+        self.max_length = max_length
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        session_options = onnxruntime.SessionOptions()
+        # Enable the full graph-optimization pipeline (operator fusion,
+        # constant folding, layout transforms) before the session is built.
+        session_options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        # Use every core for intra-op parallelism; embedding batches are the
+        # only workload in-process, so there is nothing to leave room for.
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        self.session = onnxruntime.InferenceSession(
+            model_path,
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {inp.name for inp in self.session.get_inputs()}
+
+    @staticmethod
+    def _quantized_model_path(model_path: str) -> str:
+        """
+        Returns the path of the INT8-quantized model, creating it on first use.
+        """
+        base, ext = os.path.splitext(model_path)
+        quantized_path = f"{base}.int8{ext}"
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        return quantized_path
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Tokenizes and runs one batch through the ONNX session."""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([enc.ids for enc in encodings], dtype=np.int64)
+        attention_mask = np.array([enc.attention_mask for enc in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        # First output is the token-level hidden states: (batch, seq, dim).
+        hidden_states = self.session.run(None, feeds)[0]
+
+        # Masked mean pooling, then L2 normalization.
+        mask = attention_mask[:, :, np.newaxis].astype(hidden_states.dtype)
+        summed = (hidden_states * mask).sum(axis=1)
+        counts = np.maximum(mask.sum(axis=1), 1e-9)
+        embeddings = summed / counts
+        norms = np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        embeddings = embeddings / norms
+
+        return embeddings.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a list of documents in fixed-size batches.
+        """
+        if not texts:
+            return []
+
+        processed_texts = [text.strip() or " " for text in texts]
+        results: List[List[float]] = []
+        for start in range(0, len(processed_texts), self.batch_size):
+            results.extend(self._embed_batch(processed_texts[start:start + self.batch_size]))
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embeds a single query."""
+        return self._embed_batch([text])[0]
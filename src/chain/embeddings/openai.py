@@ -3,8 +3,9 @@
 Provides a base class for embedding models that use an OpenAI-compatible API.
 This reduces code duplication between different provider implementations (e.g., Azure, local).
 """
-from typing import List, Union
-from openai import OpenAI, AzureOpenAI
+import asyncio
+from typing import List, Optional, Union
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI
 from chain.embeddings.base import BaseEmbeddings
 
 class OpenAILikeEmbeddings(BaseEmbeddings):
@@ -13,7 +14,14 @@ class OpenAILikeEmbeddings(BaseEmbeddings):
     API that follows the OpenAI SDK's conventions.
     """
     client: Union[OpenAI, AzureOpenAI]
+    # Optional native async client; when set, the async methods use it directly
+    # instead of falling back to a worker thread.
+    async_client: Optional[Union[AsyncOpenAI, AsyncAzureOpenAI]] = None
     model_name: str # The model/deployment name to be passed to the API
+    # Async batch dispatch: lists longer than `sub_batch_size` are sharded and
+    # embedded concurrently, with at most `max_concurrency` requests in flight.
+    sub_batch_size: int = 256
+    max_concurrency: int = 8
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
@@ -38,4 +46,55 @@ class OpenAILikeEmbeddings(BaseEmbeddings):
             model=self.model_name
         )
         return response.data[0].embedding
-    
\ No newline at end of file
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Asynchronously embeds a list of documents, using the native async
+        client when available.
+        """
+        if self.async_client is None:
+            return await super().aembed_documents(texts)
+
+        if not texts:
+            return []
+
+        processed_texts = [text.strip() or " " for text in texts]
+
+        if len(processed_texts) <= self.sub_batch_size:
+            response = await self.async_client.embeddings.create(
+                input=processed_texts,
+                model=self.model_name
+            )
+            return [item.embedding for item in response.data]
+
+        # Large index builds: shard into fixed-size sub-batches and overlap
+        # their round-trips, so total latency approaches the slowest shard
+        # instead of the sum of all of them. The semaphore caps in-flight
+        # requests; gather preserves input order.
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _embed_shard(shard: List[str]) -> List[List[float]]:
+            async with semaphore:
+                response = await self.async_client.embeddings.create(  # type: ignore[union-attr]
+                    input=shard,
+                    model=self.model_name
+                )
+                return [item.embedding for item in response.data]
+
+        shards = [
+            processed_texts[start:start + self.sub_batch_size]
+            for start in range(0, len(processed_texts), self.sub_batch_size)
+        ]
+        results = await asyncio.gather(*(_embed_shard(shard) for shard in shards))
+        return [embedding for shard_result in results for embedding in shard_result]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronously embeds a single query, using the native async client when available."""
+        if self.async_client is None:
+            return await super().aembed_query(text)
+
+        response = await self.async_client.embeddings.create(
+            input=[text],
+            model=self.model_name
+        )
+        return response.data[0].embedding
@@ -11,6 +11,9 @@ class BasePromptTemplate(ABC):
     """Abstract base class for prompt templates."""
     def __init__(self, input_variables: List[str]):
         self.input_variables = input_variables
+        # Frozen view used by validation: issubset against dict keys needs no
+        # per-call set allocation, unlike the old set(...) - set(...) dance.
+        self._required_variables = frozenset(input_variables)
 
     @abstractmethod
     def format(self, **kwargs: Any) -> str:
@@ -23,9 +26,9 @@ class BasePromptTemplate(ABC):
     # Make the method signature consistent. We won't use the second parameter here.
     def _validate_variables(self, variables: Dict[str, Any]) -> None:
         """Internal method to ensure all required variables are provided for formatting."""
-        missing = set(self.input_variables) - set(variables.keys())
-        if missing:
-            raise ValueError(f"Missing required input variables: {sorted(list(missing))}")
+        if not self._required_variables.issubset(variables):
+            missing = self._required_variables - variables.keys()
+            raise ValueError(f"Missing required input variables: {sorted(missing)}")
     
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(input_variables={self.input_variables})"
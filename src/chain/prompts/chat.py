@@ -3,8 +3,9 @@
 Implementation of a chat prompt template for conversational models.
 """
 from typing import Dict, Any, List, Optional
-from jinja2 import Environment, meta
+from jinja2 import meta
 from .base import BasePromptTemplate
+from .engine import compile_template, env
 
 class ChatPromptTemplate(BasePromptTemplate):
     """
@@ -28,11 +29,12 @@ class ChatPromptTemplate(BasePromptTemplate):
                 If None, variables are inferred from the message content.
         """
         self.messages = messages
-        self.jinja_env = Environment()
 
-        # Pre-compile Jinja templates for each message's content for efficiency
+        # Pre-compile Jinja templates for each message's content; the shared
+        # compile cache means repeated contents (e.g. a common system prompt)
+        # compile once per process.
         self.message_templates: List[Dict[str, Any]] = [
-            {"role": msg["role"], "template": self.jinja_env.from_string(msg.get("content", ""))}
+            {"role": msg["role"], "template": compile_template(msg.get("content", ""))}
             for msg in messages
         ]
             
@@ -46,7 +48,7 @@ class ChatPromptTemplate(BasePromptTemplate):
         all_vars = set()
         for msg in messages:
             content = msg.get("content", "")
-            ast = self.jinja_env.parse(content)
+            ast = env.parse(content)
             all_vars.update(meta.find_undeclared_variables(ast))
         return list(all_vars)
 
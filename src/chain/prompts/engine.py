@@ -0,0 +1,32 @@
+# src/chain/prompts/engine.py
+"""
+Shared Jinja2 machinery for the prompt templates.
+
+Every template class used to build its own `Environment` and compile its
+template string per instance, so constructing the same prompt twice (or a
+few-shot prompt with many identical example templates) re-parsed and
+re-compiled identical source each time. All classes now compile through
+one shared environment and a memoized compile helper keyed on the
+template string.
+"""
+from functools import lru_cache
+
+from jinja2 import Environment, Template
+
+# One environment for every prompt template in the process. Prompts are
+# rendered into model input, not HTML, so autoescaping stays off;
+# auto_reload is pointless for from_string templates and only adds checks.
+# (No bytecode cache: Jinja only consults it on the loader path, which
+# from_string never takes — compile_template's lru_cache is the real
+# memoization here.)
+env = Environment(autoescape=False, auto_reload=False)
+
+
+@lru_cache(maxsize=4096)
+def compile_template(template_string: str) -> Template:
+    """Returns the compiled template for a source string, caching by value.
+
+    Compiled templates are stateless with respect to render variables, so
+    sharing one object between template instances is safe.
+    """
+    return env.from_string(template_string)
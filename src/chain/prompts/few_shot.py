@@ -3,8 +3,8 @@
 Implementation of a few-shot prompt template for in-context learning.
 """
 from typing import Dict, Any, List
-from jinja2 import Environment
 from .base import BasePromptTemplate
+from .engine import compile_template, env
 from .prompt_template import PromptTemplate
 
 class FewShotPromptTemplate(BasePromptTemplate):
@@ -33,15 +33,14 @@ class FewShotPromptTemplate(BasePromptTemplate):
         self.example_separator = example_separator
         
         # Suffix is also a Jinja2 template
-        self.suffix_template = Environment().from_string(suffix)
+        self.suffix_template = compile_template(suffix)
         # All variables used in the suffix must be in the input_variables
         self.suffix_input_variables = self._get_template_variables(suffix)
 
     def _get_template_variables(self, template_string: str) -> List[str]:
         """Helper to extract variables from a Jinja2 template string."""
-        env = Environment()
-        ast = env.parse(template_string)
         from jinja2 import meta
+        ast = env.parse(template_string)
         return list(meta.find_undeclared_variables(ast))
     
     def format(self, **kwargs: Any) -> str:
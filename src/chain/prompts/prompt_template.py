@@ -1,8 +1,9 @@
 # src/chain/prompts/prompt_template.py
 
 from typing import Any, List, Optional, Dict
-from jinja2 import Environment
+from jinja2 import meta
 from .base import BasePromptTemplate
+from .engine import compile_template, env
 
 class PromptTemplate(BasePromptTemplate):
     """
@@ -11,18 +12,26 @@ class PromptTemplate(BasePromptTemplate):
     """
     
     def __init__(
-        self, 
-        template: str, 
-        input_variables: List[str],
+        self,
+        template: str,
+        input_variables: Optional[List[str]] = None,
         partial_variables: Optional[Dict[str, Any]] = None
     ):
-        # The input_variables are the keys the user provides at runtime.
-        super().__init__(input_variables=input_variables)
         self.template_string = template
-        self.jinja_env = Environment()
-        self.template = self.jinja_env.from_string(template)
+        self.template = compile_template(template)
         self.partial_variables = partial_variables or {}
 
+        # The input_variables are the keys the user provides at runtime.
+        # When omitted they are inferred through Jinja's own parser, which
+        # (unlike a regex over {{ ... }}) also sees variables used inside
+        # loops, conditionals, and filters. Partials aren't runtime inputs.
+        if input_variables is None:
+            ast = env.parse(template)
+            input_variables = sorted(
+                meta.find_undeclared_variables(ast) - self.partial_variables.keys()
+            )
+        super().__init__(input_variables=input_variables)
+
     def format(self, **kwargs: Any) -> str:
         """
         Renders the template with the provided and partial variables.
@@ -1,5 +1,6 @@
 # Enhanced RAGRunner with query() method for Jupyter environments
 
+import io
 from typing import List, Dict, Optional, Union
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -204,34 +205,96 @@ class RAGRunner:
         
         return all_split_docs
 
-    def _retrieve_context(self, query: str) -> str:
-        """Retrieves relevant context from the vector store."""
-        if not self.vector_store: return ""
+    def add_files(self, file_paths: List[Union[str, Path]]) -> int:
+        """
+        Incrementally ingests new files into the existing vector store.
+
+        Only the new files are loaded, split, and embedded — their vectors
+        are appended to the index in place, so adding a document costs work
+        proportional to that document rather than the whole corpus.
+
+        Args:
+            file_paths: Paths of the files to ingest
+
+        Returns:
+            The number of document chunks added to the store
+        """
+        if self.vector_store is None:
+            raise RuntimeError("RAG runner not set up. Call setup() first.")
+
+        new_docs: List[Document] = []
+        for file_path in file_paths:
+            file = Path(file_path)
+            if not file.is_file():
+                if self.config.debug:
+                    print(f"Warning: Path is not a file, skipping: {file}")
+                continue
+            try:
+                content, metadata = self._load_file_content(file)
+                new_docs.extend(self._split_content(content, file, metadata))
+                self.config.knowledge_files.append(file_path)
+            except Exception as e:
+                if self.config.debug:
+                    print(f"Skipping file {file.name}: {e}")
+                continue
+
+        if new_docs:
+            self.vector_store.add_documents(new_docs)
+        return len(new_docs)
+
+    def _retrieve_context_chunks(self, query: str, retrieval_k: Optional[int] = None,
+                                 nprobe: Optional[int] = None) -> List[tuple]:
+        """Retrieves the raw (document, score) hits for a query.
+
+        `retrieval_k` and `nprobe` override the configured values for this
+        call only, so concurrent callers never mutate shared state.
+        """
+        if not self.vector_store: return []
         try:
-            search_results = self.vector_store.similarity_search(query, k=self.config.retrieval_k)
-            return "\n\n".join([doc.page_content for doc, score in search_results])
+            k = retrieval_k if retrieval_k is not None else self.config.retrieval_k
+            if nprobe is not None:
+                return self.vector_store.similarity_search(query, k=k, nprobe=nprobe)
+            return self.vector_store.similarity_search(query, k=k)
         except Exception as e:
             if self.config.debug: print(f"[DEBUG] Error retrieving context: {e}")
-            return ""
+            return []
+
+    def _retrieve_context(self, query: str, retrieval_k: Optional[int] = None) -> str:
+        """Retrieves relevant context from the vector store as one string."""
+        search_results = self._retrieve_context_chunks(query, retrieval_k=retrieval_k)
+        return "\n\n".join(doc.page_content for doc, score in search_results)
     
-    def query(self, message: str, include_context: bool = True) -> str:
+    def query(self, message: str, include_context: bool = True, return_retrieved: bool = False,
+              retrieval_k: Optional[int] = None, nprobe: Optional[int] = None):
         """
         Invoke the model with a single message. Perfect for Jupyter environments.
-        
+
         Args:
             message: The user's question or prompt
             include_context: Whether to include retrieved context (default: True)
-            
+            return_retrieved: Also return the retrieved documents, so callers
+                that surface sources don't have to run retrieval a second time
+            retrieval_k: Per-call override for the number of retrieved chunks;
+                leaves the shared config untouched
+            nprobe: Per-call override of the IVF clusters scanned during
+                retrieval; leaves the shared index untouched
+
         Returns:
-            The model's response as a string
+            The model's response as a string, or an
+            (answer, retrieved_documents) tuple when return_retrieved is True
         """
         if not self.chat_model:
             raise RuntimeError("RAG runner not set up. Call setup() first.")
-        
+
         # Retrieve context if requested
         context = ""
+        retrieved_docs: List[Document] = []
         if include_context:
-            context = self._retrieve_context(message)
+            retrieved_docs = [
+                doc for doc, score in self._retrieve_context_chunks(
+                    message, retrieval_k=retrieval_k, nprobe=nprobe)
+            ]
+            context = "\n\n".join(doc.page_content for doc in retrieved_docs)
         
         # Prepare the enhanced message
         enhanced_message = f"Context:\n{context}\n\nQuestion: {message}" if context else message
@@ -245,17 +308,26 @@ class RAGRunner:
         
         # Get response from model
         try:
-            # If the model supports streaming, collect all chunks
+            # If the model supports streaming, accumulate the chunks into one
+            # growing buffer; each chunk becomes garbage as soon as it's
+            # written, instead of the whole chunk list coexisting with the
+            # joined result at peak.
             if hasattr(self.chat_model, 'stream'):
-                response_chunks = list(self.chat_model.stream(messages))
-                return "".join(response_chunks)
+                buffer = io.StringIO()
+                for chunk in self.chat_model.stream(messages):
+                    buffer.write(chunk)
+                answer = buffer.getvalue()
             else:
                 # Fallback for non-streaming models
-                return self.chat_model.invoke(messages)
+                answer = self.chat_model.invoke(messages)
         except Exception as e:
             if self.config.debug:
                 print(f"[DEBUG] Error in query: {e}")
             raise
+
+        if return_retrieved:
+            return answer, retrieved_docs
+        return answer
     
     def query_with_context(self, message: str, custom_context: str) -> str:
         """
@@ -278,8 +350,11 @@ class RAGRunner:
         
         try:
             if hasattr(self.chat_model, 'stream'):
-                response_chunks = list(self.chat_model.stream(messages))
-                return "".join(response_chunks)
+                # Single growing buffer; see query() for the rationale.
+                buffer = io.StringIO()
+                for chunk in self.chat_model.stream(messages):
+                    buffer.write(chunk)
+                return buffer.getvalue()
             else:
                 return self.chat_model.invoke(messages)
         except Exception as e:
@@ -402,9 +477,14 @@ class RAGRunner:
                     # Note: Removed AIMessage as it was unused
                 
                 print("[ AI  ] -> ", end="", flush=True)
-                full_response = "".join(self.chat_model.stream(messages_for_llm)) # type: ignore
-                print(full_response)
-                
+                # Print tokens as they arrive so perceived latency is governed
+                # by the first token, not the full completion.
+                full_response = ""
+                for chunk in self.chat_model.stream(messages_for_llm): # type: ignore
+                    print(chunk, end="", flush=True)
+                    full_response += chunk
+                print() # for newline
+
                 history.append({"role": "assistant", "content": full_response})
             except KeyboardInterrupt:
                 print("\n\n🤖 Session ended. Goodbye!"); break
@@ -2,6 +2,7 @@
 
 import os
 import pickle
+from functools import lru_cache
 from typing import List, Dict, Literal, Optional, Any, Tuple, Union
 import numpy as np
 from uuid import uuid4
@@ -21,17 +22,59 @@ from .base import BaseVectorStore
 
 FAISS_GPU_AVAILABLE = hasattr(faiss, 'StandardGpuResources')
 
-FaissIndexType = Literal["IndexFlatL2", "IndexIVFFlat"]
+FaissIndexType = Literal[
+    "IndexFlatL2", "IndexFlatIP", "IndexHNSWFlat", "IndexIVFFlat",
+    "IndexIVFPQ", "IndexIVFPQFastScan", "IndexScalarQuantizerFP16",
+    "IndexScalarQuantizerINT8", "IndexHNSWSQFP16", "auto",
+]
+
+# "auto" switches from exact search to compressed IVF-PQ once the first
+# batch of vectors is large enough for product quantization to pay off,
+# and to the SIMD FastScan layout once corpora grow past ~100k vectors.
+_AUTO_IVFPQ_THRESHOLD = 10_000
+_AUTO_FASTSCAN_THRESHOLD = 100_000
 
 class FAISSVectorStore(BaseVectorStore):
     """A vector store using FAISS that supports CPU/GPU and flexible initialization with custom IDs and filtering."""
-    
-    def __init__(self, embeddings: BaseEmbeddings, device: str = "cpu", **kwargs: Any):
+
+    def __init__(
+        self,
+        embeddings: BaseEmbeddings,
+        device: str = "cpu",
+        index_type: FaissIndexType = "IndexFlatL2",
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        write_buffer_size: int = 0,
+        query_cache_size: int = 1024,
+        **kwargs: Any
+    ):
         super().__init__(embeddings=embeddings, **kwargs)
         self.index: Optional[faiss.Index] = None
         self._docstore: Dict[str, Document] = {}  # Changed to use string IDs
         self._index_to_docstore_id: List[str] = []  # Changed to store string IDs
         self.device = device
+        self.index_type = index_type
+        # HNSW tuning knobs; only consulted when an HNSW index is built.
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        # Streaming-ingest write buffer. With write_buffer_size > 0, incoming
+        # vectors accumulate in one amortized-doubling float32 array and hit
+        # the index in large contiguous blocks (on threshold, search, save,
+        # or explicit flush) instead of one faiss add per small batch.
+        self.write_buffer_size = write_buffer_size
+        self._write_buffer: Optional["np.ndarray"] = None
+        self._buffered_count = 0
+        # Repeat queries (agent loops, eval sweeps) skip the embedding call
+        # and go straight to the index. Embeddings are deterministic per
+        # model, so memoizing on the exact query string is safe; 0 disables.
+        if query_cache_size > 0:
+            self._embed_query = lru_cache(maxsize=query_cache_size)(
+                self.embedding_function.embed_query
+            )
+        else:
+            self._embed_query = self.embedding_function.embed_query
         self._gpu_resources: Optional[Any] = None
         
         if self.device == "cuda":
@@ -43,6 +86,135 @@ class FAISSVectorStore(BaseVectorStore):
         """Returns the number of documents in the store."""
         return len(self._docstore)
 
+    def _create_index(self, dimension: int, training_vectors: "np.ndarray") -> "faiss.Index":
+        """
+        Builds a CPU index matching the configured `index_type`.
+
+        "IndexFlatL2" is exact brute-force search. "IndexHNSWFlat" and
+        "IndexIVFFlat" are approximate indexes that trade a little recall for
+        sub-linear search time, which matters once stores grow past a few
+        thousand documents. "IndexIVFPQ" additionally compresses vectors to
+        short product-quantization codes, cutting memory roughly 32x for
+        large corpora. "auto" picks flat search for small first batches and
+        IVF-PQ for large ones.
+
+        Args:
+            dimension: Dimensionality of the embedding vectors
+            training_vectors: The first batch of vectors, used to train IVF indexes
+
+        Returns:
+            A ready-to-use (trained, if necessary) FAISS index
+        """
+        index_type = self.index_type
+        if index_type == "auto":
+            if len(training_vectors) > _AUTO_FASTSCAN_THRESHOLD:
+                index_type = "IndexIVFPQFastScan"
+            elif len(training_vectors) > _AUTO_IVFPQ_THRESHOLD:
+                index_type = "IndexIVFPQ"
+            else:
+                index_type = "IndexFlatL2"
+
+        if index_type == "IndexHNSWFlat":
+            # 32 neighbors per node is the common accuracy/speed middle
+            # ground; higher efSearch buys recall at query-time cost.
+            index = faiss.IndexHNSWFlat(dimension, self.hnsw_m)
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return index
+
+        if index_type == "IndexIVFFlat":
+            # Cap nlist by the amount of training data so small first batches
+            # can still train the coarse quantizer.
+            nlist = min(64, max(1, int(np.sqrt(len(training_vectors)))))
+            quantizer = faiss.IndexFlatL2(dimension)
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+            index.train(training_vectors) # type: ignore
+            return index
+
+        if index_type == "IndexIVFPQ":
+            nlist = min(100, max(1, int(np.sqrt(len(training_vectors)))))
+            # Sub-vector count must divide the dimension; prefer 16 codes
+            # per vector (16 bytes with 8-bit codebooks).
+            m = next(m for m in (16, 8, 4, 2, 1) if dimension % m == 0)
+            # Each codebook needs at least 2**nbits training points; shrink
+            # the codebooks when the first batch is small.
+            nbits = 8
+            while nbits > 1 and len(training_vectors) < (1 << nbits):
+                nbits -= 1
+            index = faiss.index_factory(dimension, f"IVF{nlist},PQ{m}x{nbits}")
+            index.train(training_vectors) # type: ignore
+            index.nprobe = 10 # Clusters scanned per query; tune recall/speed
+            return index
+
+        if index_type == "IndexIVFPQFastScan":
+            # 4-bit PQ with codes interleaved for SIMD register-table
+            # lookups; same search API as IVF-PQ but the distance scan runs
+            # several times faster on large corpora.
+            nlist = min(1024, max(1, int(np.sqrt(len(training_vectors)))))
+            # FastScan packs code pairs into bytes, so the sub-vector count
+            # must be even (and divide the dimension).
+            m = next((m for m in (32, 16, 8, 4, 2) if dimension % m == 0), None)
+            if m is None:
+                raise ValueError(
+                    "IndexIVFPQFastScan requires an embedding dimension "
+                    f"divisible by an even sub-vector count, got {dimension}."
+                )
+            index = faiss.index_factory(dimension, f"IVF{nlist},PQ{m}x4fsr")
+            index.train(training_vectors) # type: ignore
+            index.nprobe = 16
+            return index
+
+        if index_type == "IndexFlatIP":
+            # Inner product over L2-normalized vectors is cosine similarity,
+            # and it is cheaper per lane than L2 (no subtraction, no implicit
+            # square). The store normalizes vectors on add and on query, so
+            # returned scores are cosine similarities (higher is better).
+            return faiss.IndexFlatIP(dimension)
+
+        if index_type == "IndexScalarQuantizerFP16":
+            # Vectors stored as 16-bit floats: half the memory and memory
+            # bandwidth of FP32 (and twice the SIMD lanes per scan) with
+            # near-identical recall. Needs no training, so it is a drop-in
+            # replacement for flat search on memory-constrained hosts.
+            return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+
+        if index_type == "IndexScalarQuantizerINT8":
+            # 8-bit codes: quarter the memory of FP32. Unlike fp16 this
+            # quantizer learns per-dimension ranges, so it trains on the
+            # first batch.
+            index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit)
+            index.train(training_vectors) # type: ignore
+            return index
+
+        if index_type == "IndexHNSWSQFP16":
+            # Sub-linear HNSW traversal over fp16-compressed vectors —
+            # combines the graph index's O(log N) search with half the
+            # bytes per distance evaluation. Uses the same HNSW knobs as
+            # IndexHNSWFlat.
+            index = faiss.IndexHNSWSQ(
+                dimension, faiss.ScalarQuantizer.QT_fp16, self.hnsw_m
+            )
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            index.train(training_vectors) # type: ignore
+            return index
+
+        # Default: simple, exact, extendable index.
+        return faiss.IndexFlatL2(dimension)
+
+    def _uses_inner_product(self) -> bool:
+        """True when the active index ranks by inner product (cosine)."""
+        return (
+            self.index is not None
+            and getattr(self.index, "metric_type", None) == faiss.METRIC_INNER_PRODUCT
+        )
+
+    def _maybe_normalize(self, vectors_np: "np.ndarray") -> "np.ndarray":
+        """L2-normalizes in place for inner-product indexes; no-op otherwise."""
+        if self._uses_inner_product():
+            faiss.normalize_L2(vectors_np)
+        return vectors_np
+
     def add_documents( # type: ignore
         self, 
         documents: List[Document], 
@@ -61,41 +233,116 @@ class FAISSVectorStore(BaseVectorStore):
         """
         if not documents:
             return []
-            
-        # Generate IDs if not provided (backward compatibility)
+
+        # ID generation and validation happen in add_embeddings. The _np
+        # variant hands over a ready float32 matrix, skipping the nested
+        # Python lists for backends that produce arrays natively.
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_function.embed_documents_np(texts)
+        return self.add_embeddings(documents, vectors, ids=ids)
+
+    def add_embeddings(
+        self,
+        documents: List[Document],
+        embeddings: Union[List[List[float]], "np.ndarray"],
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Adds documents whose vectors were already computed elsewhere.
+
+        Lets ingestion pipelines batch their own embedding calls (or reuse
+        vectors from another store) and feed the results straight into the
+        index without a second embedding pass.
+
+        Args:
+            documents: Documents matching the embeddings, in order
+            embeddings: One embedding vector per document
+            ids: Optional list of custom IDs. If not provided, UUIDs will be generated
+
+        Returns:
+            List of document IDs that were used
+        """
+        if len(embeddings) != len(documents):
+            raise ValueError(
+                f"Number of embeddings ({len(embeddings)}) must match "
+                f"number of documents ({len(documents)})"
+            )
         if ids is None:
             ids = [str(uuid4()) for _ in range(len(documents))]
         elif len(ids) != len(documents):
             raise ValueError(f"Number of ids ({len(ids)}) must match number of documents ({len(documents)})")
-        
-        # Check for duplicate IDs
-        existing_ids = set(self._docstore.keys())
-        duplicate_ids = set(ids) & existing_ids
+
+        duplicate_ids = set(ids) & set(self._docstore.keys())
         if duplicate_ids:
             raise ValueError(f"Document IDs already exist: {duplicate_ids}")
-        
-        texts = [doc.page_content for doc in documents]
-        vectors = self.embedding_function.embed_documents(texts)
-        vectors_np = np.array(vectors, dtype=np.float32)
 
-        if self.index is None:
-            dimension = vectors_np.shape[1]
-            # Use a simple, extendable index by default
-            cpu_index = faiss.IndexFlatL2(dimension)
-            if self.device == "cuda" and self._gpu_resources:
-                self.index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, cpu_index) # type: ignore
-            else:
-                self.index = cpu_index
-        
-        self.index.add(vectors_np) # type: ignore
+        # asarray is a no-op for an already-float32 matrix, so array-native
+        # embedding backends feed the index without a conversion copy.
+        vectors_np = np.asarray(embeddings, dtype=np.float32)
+
+        if self.write_buffer_size > 0:
+            self._append_to_buffer(vectors_np)
+            if self._buffered_count >= self.write_buffer_size:
+                self.flush()
+        else:
+            if self.index is None:
+                self.index = self._build_index(vectors_np)
+            if vectors_np is embeddings and self._uses_inner_product():
+                # asarray didn't copy, and normalization is in-place: don't
+                # silently rescale the caller's array.
+                vectors_np = vectors_np.copy()
+            self.index.add(self._maybe_normalize(vectors_np)) # type: ignore
 
         # Store documents with their custom IDs
         for doc_id, doc in zip(ids, documents):
             self._docstore[doc_id] = doc
             self._index_to_docstore_id.append(doc_id)
-            
+
         return ids
 
+    def _build_index(self, training_vectors: "np.ndarray") -> "faiss.Index":
+        """Creates the index for the first batch, moving it to GPU if configured."""
+        cpu_index = self._create_index(training_vectors.shape[1], training_vectors)
+        if self.device == "cuda" and self._gpu_resources:
+            return faiss.index_cpu_to_gpu(self._gpu_resources, 0, cpu_index) # type: ignore
+        return cpu_index
+
+    def _append_to_buffer(self, vectors_np: "np.ndarray") -> None:
+        """Copies vectors into the write buffer, doubling capacity as needed."""
+        count = len(vectors_np)
+        if self._write_buffer is None:
+            capacity = max(self.write_buffer_size, count)
+            self._write_buffer = np.empty((capacity, vectors_np.shape[1]), dtype=np.float32)
+            self._buffered_count = 0
+        needed = self._buffered_count + count
+        if needed > len(self._write_buffer):
+            capacity = len(self._write_buffer)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty((capacity, self._write_buffer.shape[1]), dtype=np.float32)
+            grown[:self._buffered_count] = self._write_buffer[:self._buffered_count]
+            self._write_buffer = grown
+        self._write_buffer[self._buffered_count:needed] = vectors_np
+        self._buffered_count = needed
+
+    def flush(self) -> None:
+        """
+        Moves buffered vectors into the index as one contiguous block.
+
+        Called automatically when the buffer reaches `write_buffer_size` and
+        before any search or save, so buffering never changes results — only
+        when the faiss `add` calls happen. A deferred first flush also means
+        trainable indexes see the whole buffered block as training data.
+        """
+        if self._write_buffer is None or self._buffered_count == 0:
+            return
+        block = self._write_buffer[:self._buffered_count]
+        if self.index is None:
+            self.index = self._build_index(block)
+        self.index.add(self._maybe_normalize(block)) # type: ignore
+        self._write_buffer = None
+        self._buffered_count = 0
+
     def _filter_documents(
         self, 
         documents_with_scores: List[Tuple[Document, float]], 
@@ -128,28 +375,60 @@ class FAISSVectorStore(BaseVectorStore):
         return filtered_results
 
     def similarity_search(
-        self, 
-        query: str, 
-        k: int = 4, 
+        self,
+        query: str,
+        k: int = 4,
         filter: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
         **kwargs: Any
     ) -> List[Tuple[Document, float]]:
         """
         Performs a similarity search with optional metadata filtering.
-        
+
         Args:
             query: Query string to search for
             k: Number of results to return
             filter: Optional dictionary of metadata filters
-            
+            nprobe: Per-call override of the clusters scanned on IVF-style
+                indexes; ignored by index types without an nprobe
+
+        Returns:
+            List of (document, score) tuples
+        """
+        return self.similarity_search_by_vector(
+            self._embed_query(query), k=k, filter=filter, nprobe=nprobe, **kwargs
+        )
+
+    def similarity_search_by_vector(
+        self,
+        embedding: Union[List[float], "np.ndarray"],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        nprobe: Optional[int] = None,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """
+        Performs a similarity search against a precomputed query vector.
+
+        Callers that already hold the query's embedding (e.g. because they
+        probed a cache with it) search directly without a second embedding
+        call.
+
+        Args:
+            embedding: The query's embedding vector
+            k: Number of results to return
+            filter: Optional dictionary of metadata filters
+            nprobe: Per-call override of the clusters scanned on IVF-style
+                indexes; ignored by index types without an nprobe
+
         Returns:
             List of (document, score) tuples
         """
+        self.flush() # Buffered vectors must be searchable
         if self.index is None or len(self._docstore) == 0:
             return []
-            
-        query_vector = self.embedding_function.embed_query(query)
-        query_vector_np = np.array([query_vector], dtype=np.float32)
+
+        query_vector_np = self._maybe_normalize(np.array([embedding], dtype=np.float32))
 
         # If we have filters, we might need to search more documents initially
         # then filter them down to k results
@@ -161,7 +440,12 @@ class FAISSVectorStore(BaseVectorStore):
 
         # Ensure search_k is not greater than the number of vectors in the index
         search_k = min(search_k, len(self._docstore))
-        distances, indices = self.index.search(query_vector_np, search_k) # type: ignore
+        # Per-call search parameters leave the shared index untouched, so
+        # concurrent callers with different nprobe values never race.
+        search_kwargs: Dict[str, Any] = {}
+        if nprobe is not None and hasattr(self.index, "nprobe"):
+            search_kwargs["params"] = faiss.SearchParametersIVF(nprobe=nprobe)
+        distances, indices = self.index.search(query_vector_np, search_k, **search_kwargs) # type: ignore
 
         valid_mask = indices[0] != -1
         valid_indices = indices[0][valid_mask]
@@ -181,6 +465,58 @@ class FAISSVectorStore(BaseVectorStore):
         else:
             return all_results[:k]
 
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Performs similarity search for several queries in one FAISS call.
+
+        All queries are embedded in a single batch request and searched as one
+        (n, d) matrix, so FAISS runs one fused distance computation instead of
+        n separate scans. Useful for multi-probe strategies that sweep several
+        phrasings of the same question.
+
+        Args:
+            queries: Query strings to search for
+            k: Number of results to return per query
+            filter: Optional dictionary of metadata filters applied to each query
+
+        Returns:
+            One list of (document, score) tuples per query, in input order
+        """
+        if not queries:
+            return []
+        self.flush() # Buffered vectors must be searchable
+        if self.index is None or len(self._docstore) == 0:
+            return [[] for _ in queries]
+
+        query_vectors = self.embedding_function.embed_documents(queries)
+        query_matrix = self._maybe_normalize(np.array(query_vectors, dtype=np.float32))
+
+        search_k = k
+        if filter:
+            search_k = min(k * 10, len(self._docstore))
+        search_k = min(search_k, len(self._docstore))
+
+        distances, indices = self.index.search(query_matrix, search_k) # type: ignore
+
+        batch_results: List[List[Tuple[Document, float]]] = []
+        for row_indices, row_distances in zip(indices, distances):
+            valid_mask = row_indices != -1
+            results = [
+                (self._docstore[self._index_to_docstore_id[i]], float(dist))
+                for i, dist in zip(row_indices[valid_mask], row_distances[valid_mask])
+            ]
+            if filter:
+                results = self._filter_documents(results, filter)
+            batch_results.append(results[:k])
+
+        return batch_results
+
     def similarity_search_without_scores(
         self, 
         query: str, 
@@ -261,6 +597,7 @@ class FAISSVectorStore(BaseVectorStore):
 
     def save_local(self, folder_path: str):
         """Saves the FAISS index and document store to a local folder."""
+        self.flush() # Buffered vectors must reach the index before it's written
         if self.index is None:
             raise ValueError("Cannot save an empty or uninitialized vector store.")
             
@@ -279,19 +616,27 @@ class FAISSVectorStore(BaseVectorStore):
 
     @classmethod
     def load_local(
-        cls, folder_path: str, embeddings: BaseEmbeddings, device: str = "cpu"
+        cls, folder_path: str, embeddings: BaseEmbeddings, device: str = "cpu",
+        mmap: bool = False
     ) -> "FAISSVectorStore":
-        """Loads a FAISSVectorStore from a local folder to the specified device."""
+        """
+        Loads a FAISSVectorStore from a local folder to the specified device.
+
+        With `mmap=True` the index file is memory-mapped instead of read into
+        RAM, so warm restarts serve vectors straight from the OS page cache.
+        Only meaningful for CPU loading; a GPU transfer copies the data anyway.
+        """
         index_path = os.path.join(folder_path, "index.faiss")
         docstore_path = os.path.join(folder_path, "docstore.pkl")
-        
-        if not os.path.exists(index_path) or not os.path.exists(docstore_path): 
+
+        if not os.path.exists(index_path) or not os.path.exists(docstore_path):
             raise FileNotFoundError(f"Vector store files not found in: {folder_path}")
 
         # The index_type is determined by the loaded file, so we can set a default.
         store = cls(embeddings=embeddings, device=device, index_type="IndexFlatL2")
-        
-        cpu_index = faiss.read_index(index_path)
+
+        io_flags = (faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY) if mmap else 0
+        cpu_index = faiss.read_index(index_path, io_flags)
         
         if store.device == "cuda" and store._gpu_resources is not None:
             store.index = faiss.index_cpu_to_gpu(store._gpu_resources, 0, cpu_index) # type: ignore
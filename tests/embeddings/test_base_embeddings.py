@@ -0,0 +1,53 @@
+# tests/embeddings/test_base_embeddings.py
+"""
+Unit tests for the async helpers on `BaseEmbeddings`.
+
+These tests use a deterministic mock embedder, so they run everywhere
+without needing a local server or cloud credentials.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+import asyncio
+
+import pytest
+
+from chain.embeddings.base import BaseEmbeddings
+
+# --- Mocking Dependencies ---
+
+class MockEmbeddings(BaseEmbeddings):
+    """A mock embedding class that derives vectors from the text length."""
+    def __init__(self, dimension: int = 4):
+        self.dimension = dimension
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text))] * self.dimension
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+# --- Test Functions ---
+
+def test_aembed_query_falls_back_to_sync_implementation():
+    """The default aembed_query should produce the same vector as embed_query."""
+    embeddings = MockEmbeddings()
+    result = asyncio.run(embeddings.aembed_query("hello"))
+    assert result == embeddings.embed_query("hello")
+
+
+def test_aembed_documents_falls_back_to_sync_implementation():
+    """The default aembed_documents should match the sync embed_documents."""
+    embeddings = MockEmbeddings()
+    texts = ["one", "three", "seven"]
+    result = asyncio.run(embeddings.aembed_documents(texts))
+    assert result == embeddings.embed_documents(texts)
+
+
+def test_aembed_queries_preserves_input_order():
+    """Concurrent fan-out must reassemble results in the original order."""
+    embeddings = MockEmbeddings()
+    texts = ["a", "bb", "ccc", "dddd", "eeeee", "ffffff", "ggggggg"]
+    results = asyncio.run(embeddings.aembed_queries(texts, max_concurrency=3))
+    assert results == [embeddings.embed_query(text) for text in texts]
@@ -0,0 +1,56 @@
+# tests/embeddings/test_openai_like_embeddings.py
+"""
+Unit tests for the batch-dispatch logic on `OpenAILikeEmbeddings`.
+
+These tests use a fake async client, so they run everywhere without a
+local server or cloud credentials.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+import asyncio
+from types import SimpleNamespace
+
+from chain.embeddings.openai import OpenAILikeEmbeddings
+
+# --- Mocking Dependencies ---
+
+class FakeAsyncEmbeddingsAPI:
+    """Records each create() call and returns length-derived vectors."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, input, model):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(embedding=[float(len(text))] * 4) for text in input]
+        return SimpleNamespace(data=data)
+
+
+def make_embeddings(sub_batch_size: int = 256) -> tuple[OpenAILikeEmbeddings, FakeAsyncEmbeddingsAPI]:
+    api = FakeAsyncEmbeddingsAPI()
+    embeddings = OpenAILikeEmbeddings(model_name="fake-model")
+    embeddings.async_client = SimpleNamespace(embeddings=api)  # type: ignore[assignment]
+    embeddings.sub_batch_size = sub_batch_size
+    return embeddings, api
+
+# --- Test Functions ---
+
+def test_small_batch_uses_a_single_request():
+    """Lists at or under the sub-batch size go out as one API call."""
+    embeddings, api = make_embeddings(sub_batch_size=8)
+    texts = ["a", "bb", "ccc"]
+    results = asyncio.run(embeddings.aembed_documents(texts))
+    assert len(api.calls) == 1
+    assert results == [[1.0] * 4, [2.0] * 4, [3.0] * 4]
+
+
+def test_large_batch_is_sharded_and_order_preserved():
+    """Oversized lists are split into sub-batches and reassembled in order."""
+    embeddings, api = make_embeddings(sub_batch_size=4)
+    texts = ["x" * (i + 1) for i in range(11)]
+    results = asyncio.run(embeddings.aembed_documents(texts))
+    assert len(api.calls) == 3
+    assert [len(call) for call in api.calls] == [4, 4, 3]
+    assert results == [[float(i + 1)] * 4 for i in range(11)]
@@ -107,6 +107,192 @@ def test_persistence_save_and_load(tmp_path, device):
     assert len(results) == 1
     assert results[0][0].page_content == "Test persistence."
 
+@requires_faiss
+def test_similarity_search_batch_matches_single_queries():
+    """
+    Tests that a batched multi-query search returns the same hits as
+    issuing the queries one at a time.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Fact number {i}.") for i in range(10)]
+    vector_store = FAISSVectorStore.from_documents(documents=docs, embeddings=embeddings)
+
+    queries = ["Fact number 2.", "Fact number 5.", "Fact number 9."]
+    batch_results = vector_store.similarity_search_batch(queries, k=2)
+
+    assert len(batch_results) == len(queries)
+    for query, results in zip(queries, batch_results):
+        single_results = vector_store.similarity_search(query, k=2)
+        assert [doc.page_content for doc, _ in results] == [
+            doc.page_content for doc, _ in single_results
+        ]
+
+@requires_faiss
+def test_similarity_search_by_vector_matches_text_search():
+    """
+    Tests that searching with a precomputed query vector returns the same
+    hits as embedding the query string through similarity_search.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Vector fact {i}.") for i in range(10)]
+    vector_store = FAISSVectorStore.from_documents(documents=docs, embeddings=embeddings)
+
+    query = "Vector fact 4."
+    by_text = vector_store.similarity_search(query, k=3)
+    by_vector = vector_store.similarity_search_by_vector(embeddings.embed_query(query), k=3)
+
+    assert [doc.page_content for doc, _ in by_vector] == [
+        doc.page_content for doc, _ in by_text
+    ]
+
+@requires_faiss
+def test_load_local_with_mmap(tmp_path):
+    """
+    Tests that a saved store can be reopened with mmap=True and still searched.
+    """
+    folder_path = str(tmp_path)
+    embeddings = MockEmbeddings()
+
+    original_store = FAISSVectorStore.from_documents(
+        documents=[Document(page_content="Memory-mapped loading.")],
+        embeddings=embeddings,
+    )
+    original_store.save_local(folder_path)
+
+    loaded_store = FAISSVectorStore.load_local(folder_path, embeddings, mmap=True)
+
+    results = loaded_store.similarity_search(query="Memory-mapped loading.", k=1)
+    assert len(results) == 1
+    assert results[0][0].page_content == "Memory-mapped loading."
+
+@requires_faiss
+@pytest.mark.parametrize("index_type", [
+    "IndexFlatL2", "IndexHNSWFlat", "IndexIVFFlat",
+    "IndexScalarQuantizerFP16", "IndexScalarQuantizerINT8", "IndexHNSWSQFP16",
+])
+def test_add_and_search_with_index_type(index_type):
+    """
+    Tests that each supported index type can ingest documents and
+    retrieve the best match.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Document number {i}.") for i in range(20)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type=index_type
+    )
+    results = vector_store.similarity_search(query="Document number 7.", k=1)
+
+    assert len(results) == 1
+    assert results[0][0].page_content == "Document number 7."
+
+@requires_faiss
+def test_add_embeddings_with_precomputed_vectors():
+    """
+    Tests that precomputed vectors can be added without a second embedding
+    pass and are searchable afterwards.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Precomputed doc {i}.") for i in range(5)]
+    vectors = embeddings.embed_documents([doc.page_content for doc in docs])
+
+    vector_store = FAISSVectorStore(embeddings=embeddings)
+    ids = vector_store.add_embeddings(docs, vectors)
+
+    assert len(ids) == 5
+    results = vector_store.similarity_search(query="Precomputed doc 2.", k=1)
+    assert results[0][0].page_content == "Precomputed doc 2."
+
+    with pytest.raises(ValueError):
+        vector_store.add_embeddings(docs[:1], vectors)  # mismatched lengths
+
+@requires_faiss
+def test_inner_product_index_returns_cosine_scores():
+    """
+    Tests that the inner-product index normalizes vectors so an exact
+    duplicate query scores a cosine similarity of 1.0.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Cosine doc {i}.") for i in range(10)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type="IndexFlatIP"
+    )
+    results = vector_store.similarity_search(query="Cosine doc 3.", k=1)
+
+    assert results[0][0].page_content == "Cosine doc 3."
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+@requires_faiss
+def test_ivfpq_index_trains_and_searches():
+    """
+    Tests that the compressed IVF-PQ index type trains on the first batch
+    and serves searches with the tuned nprobe.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Compressed fact {i}.") for i in range(300)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type="IndexIVFPQ"
+    )
+
+    assert isinstance(vector_store.index, faiss.IndexIVFPQ) # type: ignore
+    assert vector_store.index.nprobe == 10
+    results = vector_store.similarity_search(query="Compressed fact 5.", k=3)
+    assert len(results) == 3
+
+@requires_faiss
+def test_per_call_nprobe_leaves_index_untouched():
+    """
+    Tests that an nprobe override applies per search call without mutating
+    the shared index's configured nprobe.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Probed fact {i}.") for i in range(300)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type="IndexIVFPQ"
+    )
+    configured_nprobe = vector_store.index.nprobe
+
+    results = vector_store.similarity_search(query="Probed fact 5.", k=3, nprobe=50)
+
+    assert len(results) == 3
+    assert vector_store.index.nprobe == configured_nprobe
+
+@requires_faiss
+def test_ivfpq_fastscan_index_trains_and_searches():
+    """
+    Tests that the SIMD FastScan index type trains and serves searches
+    through the same similarity_search API.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"FastScan fact {i}.") for i in range(300)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type="IndexIVFPQFastScan"
+    )
+
+    assert isinstance(vector_store.index, faiss.IndexIVFPQFastScan) # type: ignore
+    assert vector_store.index.nprobe == 16
+    results = vector_store.similarity_search(query="FastScan fact 5.", k=3)
+    assert len(results) == 3
+
+@requires_faiss
+def test_auto_index_type_uses_flat_for_small_batches():
+    """
+    Tests that "auto" falls back to exact flat search when the first batch
+    is too small to justify IVF-PQ compression.
+    """
+    embeddings = MockEmbeddings()
+    docs = [Document(page_content=f"Small corpus doc {i}.") for i in range(10)]
+
+    vector_store = FAISSVectorStore.from_documents(
+        documents=docs, embeddings=embeddings, index_type="auto"
+    )
+
+    assert isinstance(vector_store.index, faiss.IndexFlatL2) # type: ignore
+
 @requires_faiss
 def test_search_on_empty_store_returns_empty_list():
     """
@@ -114,4 +300,73 @@ def test_search_on_empty_store_returns_empty_list():
     """
     vector_store = FAISSVectorStore(embeddings=MockEmbeddings())
     results = vector_store.similarity_search(query="anything")
-    assert results == []
\ No newline at end of file
+    assert results == []
+
+@requires_faiss
+def test_write_buffer_defers_adds_until_needed():
+    """
+    Tests that a buffered store holds vectors out of the index until a
+    search forces a flush, and that results are unaffected.
+    """
+    vector_store = FAISSVectorStore(embeddings=MockEmbeddings(), write_buffer_size=100)
+    docs = [Document(page_content=f"Buffered doc {i}.") for i in range(4)]
+    vector_store.add_documents(docs)
+
+    # Below the threshold nothing has reached the index yet.
+    assert vector_store.index is None
+    assert len(vector_store) == 4
+
+    # Searching flushes the buffer first, so results see every document.
+    results = vector_store.similarity_search(query="Buffered doc 2.", k=1)
+    assert results[0][0].page_content == "Buffered doc 2."
+    assert vector_store.index.ntotal == 4
+
+
+@requires_faiss
+def test_write_buffer_flushes_at_threshold():
+    """
+    Tests that crossing the buffer threshold moves vectors into the index
+    without waiting for a search.
+    """
+    vector_store = FAISSVectorStore(embeddings=MockEmbeddings(), write_buffer_size=4)
+    docs = [Document(page_content=f"Threshold doc {i}.") for i in range(6)]
+    vector_store.add_documents(docs)
+
+    assert vector_store.index is not None
+    assert vector_store.index.ntotal == 6
+
+
+@requires_faiss
+def test_repeat_queries_reuse_cached_embeddings():
+    """
+    Tests that issuing the same query twice embeds it only once, while a
+    store with the cache disabled embeds every time.
+    """
+    class CountingEmbeddings(MockEmbeddings):
+        def __init__(self):
+            super().__init__()
+            self.query_calls = 0
+
+        def embed_query(self, text: str) -> list[float]:
+            self.query_calls += 1
+            return super().embed_query(text)
+
+        def embed_documents(self, texts: list[str]) -> list[list[float]]:
+            # Bypass the per-query counter so only search-time embeds count.
+            return [MockEmbeddings.embed_query(self, text) for text in texts]
+
+    embeddings = CountingEmbeddings()
+    vector_store = FAISSVectorStore(embeddings=embeddings)
+    vector_store.add_documents([Document(page_content="Cached query doc.")])
+
+    vector_store.similarity_search(query="Cached query doc.", k=1)
+    vector_store.similarity_search(query="Cached query doc.", k=1)
+    assert embeddings.query_calls == 1
+
+    uncached = CountingEmbeddings()
+    vector_store = FAISSVectorStore(embeddings=uncached, query_cache_size=0)
+    vector_store.add_documents([Document(page_content="Uncached query doc.")])
+
+    vector_store.similarity_search(query="Uncached query doc.", k=1)
+    vector_store.similarity_search(query="Uncached query doc.", k=1)
+    assert uncached.query_calls == 2